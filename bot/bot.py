@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
+import hashlib
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 
 import discord
@@ -17,10 +21,27 @@ from bot.services.violation_tracker import ViolationTracker
 from bot.utils.permissions import is_privileged
 from bot.utils.schedule import compute_next_run, generate_schedule_times
 from config import AppConfig
-from web.utils.event_hub import event_hub
+from db.models import SpamLog
+from web.utils.event_hub import get_hub
 
 log = logging.getLogger(__name__)
 
+LOG_FLUSH_INTERVAL_SECONDS = 0.05
+# 로그 기록이 실패했을 때 재시도 간격(초). 실패할 때마다 두 배로 늘려 상한에서 멈춘다.
+LOG_RETRY_INITIAL_SECONDS = 1.0
+LOG_RETRY_MAX_SECONDS = 60.0
+CURRENCY_SEND_CONCURRENCY = 8
+_TIMEOUT_DELTA = dt.timedelta(minutes=10)
+_POINTS = {
+    SpamActionType.WARN: 1,
+    SpamActionType.DELETE: 1,
+    SpamActionType.TIMEOUT: 3,
+    SpamActionType.KICK: 5,
+}
+# 게이트웨이 캐시에 채널이 없을 때 _resolve_report_channel_cached가 돌려주는 표식
+_MISS = object()
+COMMAND_HASH_PATH = Path(__file__).resolve().parent.parent / ".command_hash"
+
 
 class SpamGuardBot(commands.Bot):
     def __init__(
@@ -42,23 +63,92 @@ class SpamGuardBot(commands.Bot):
         self.spam_detector = spam_detector
         self.currency_reporter = CurrencyReporter(app_config.currency_report)
         self._currency_task: Optional[tasks.Loop] = None
+        # DB 호출 전용 스레드 풀. 기본 executor를 공유하지 않아 메시지 폭주 시에도 스레드 수가 고정된다.
+        self._db_executor = ThreadPoolExecutor(max_workers=app_config.db_pool_size, thread_name_prefix="db")
+        # 제재 로그는 log_service에 쌓아 두고, 이 이벤트가 켜지면 writer 태스크가 한 번에 기록한다.
+        self._log_pending = asyncio.Event()
+        self._log_writer_task: Optional[asyncio.Task] = None
 
     async def setup_hook(self) -> None:
         from bot.events import message_events
 
+        self._log_writer_task = asyncio.create_task(self._run_log_writer())
         message_events.setup(self)
         self._register_slash_commands()
         self._start_currency_report_task()
-        await self.tree.sync()
+        await self._sync_commands_if_changed()
         log.info("SpamGuardBot setup complete")
 
+    async def _sync_commands_if_changed(self) -> None:
+        """
+        Sync slash commands only when their payload differs from the last synced one.
+        The hash of the last sync is persisted next to the project so restarts can skip it.
+        """
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        # 다른 애플리케이션(봇 토큰)으로 바꾸면 다시 동기화되도록 ID를 함께 저장한다.
+        signature = f"{self.application_id}:{digest}"
+        try:
+            previous = COMMAND_HASH_PATH.read_text(encoding="utf-8").strip()
+        except OSError:
+            previous = None
+        if previous == signature:
+            log.info("Slash commands unchanged; skipping tree sync")
+            return
+
+        await self.tree.sync()
+        try:
+            COMMAND_HASH_PATH.write_text(signature, encoding="utf-8")
+        except OSError:
+            log.warning("Failed to persist slash command hash to %s", COMMAND_HASH_PATH)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._log_writer_task:
+            self._log_writer_task.cancel()
+        await self._flush_logs()
+        await self.currency_reporter.aclose()
+        self._db_executor.shutdown(wait=False)
+
+    async def _run_log_writer(self) -> None:
+        retry_delay = LOG_RETRY_INITIAL_SECONDS
+        while True:
+            await self._log_pending.wait()
+            # 짧게 기다려 폭주 중에 들어오는 로그를 한 배치로 묶는다.
+            await asyncio.sleep(LOG_FLUSH_INTERVAL_SECONDS)
+            self._log_pending.clear()
+            if await self._flush_logs():
+                retry_delay = LOG_RETRY_INITIAL_SECONDS
+                continue
+            # 실패한 행은 서비스 큐에 되돌아가 있으므로 새 위반이 없어도 다시 시도한다.
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, LOG_RETRY_MAX_SECONDS)
+            self._log_pending.set()
+
+    async def _flush_logs(self) -> bool:
+        if not self.log_service.has_pending():
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._db_executor, self.log_service.flush)
+        except Exception:
+            log.exception("Failed to write queued spam logs")
+            return False
+        return True
+
     async def fetch_guild_settings(self, guild_id: int) -> GuildSettings:
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.config_store.get_or_create, guild_id)
+        return await loop.run_in_executor(self._db_executor, self.config_store.get_or_create, guild_id)
 
     async def fetch_all_guild_settings(self) -> list[GuildSettings]:
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: list(self.config_store.list_all()))
+        return await loop.run_in_executor(self._db_executor, lambda: list(self.config_store.list_all()))
+
+    async def fetch_user_history(self, guild_id: int, user_id: int, limit: int = 20) -> list[SpamLog]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._db_executor, self.log_service.fetch_user_history, guild_id, user_id, limit
+        )
 
     async def log_violation(
         self,
@@ -70,21 +160,13 @@ class SpamGuardBot(commands.Bot):
         points: int = 0,
         violation_count: int = 0,
     ) -> None:
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            self.log_service.log_violation,
-            guild_id,
-            user_id,
-            reason,
-            details,
-            action,
-            points,
-            violation_count,
-        )
+        self.log_service.log_violation(guild_id, user_id, reason, details, action, points, violation_count)
+        self._log_pending.set()
         # 실시간 업데이트를 위해 이벤트 발행
-        log.info("Publishing SSE event: new_log for guild %s", guild_id)
-        await event_hub.publish("new_log", {
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Publishing SSE event: new_log for guild %s", guild_id)
+        # 허브의 디스패처 태스크가 직렬화와 팬아웃을 맡으므로 여기서는 넣기만 한다.
+        get_hub().publish("new_log", {
             "guild_id": guild_id,
             "user_id": user_id,
             "reason": reason,
@@ -121,15 +203,7 @@ class SpamGuardBot(commands.Bot):
         )
 
     def _points_for_action(self, action: SpamActionType) -> int:
-        if action == SpamActionType.WARN:
-            return 1
-        if action == SpamActionType.DELETE:
-            return 1
-        if action == SpamActionType.TIMEOUT:
-            return 3
-        if action == SpamActionType.KICK:
-            return 5
-        return 0
+        return _POINTS.get(action, 0)
 
     async def _send_warning(self, message: discord.Message, reason: str, count: int) -> None:
         """Send warning via DM instead of posting in the server."""
@@ -139,21 +213,18 @@ class SpamGuardBot(commands.Bot):
         try:
             await member.send(f"⚠️ 스팸 감지 ({reason}) - 누적 {count}회. 계속될 경우 제재됩니다.")
         except discord.HTTPException:
-            log.debug("Failed to DM warning to user %s in guild %s", member.id, message.guild and message.guild.id)
+            log.debug("Failed to DM warning to user %s in guild %s", member.id, member.guild.id)
 
     async def _delete_message(self, message: discord.Message, reason: str) -> None:
         try:
             await message.delete()
         except discord.HTTPException:
-            log.warning("Failed to delete spam message: guild=%s", message.guild and message.guild.id)
+            log.warning("Failed to delete spam message: guild=%s", message.guild.id if message.guild else None)
 
-        async with message.channel.typing():
-            await message.channel.send(
-                f"🧹 스팸 메시지를 삭제했습니다. (사유: {reason})", delete_after=5
-            )
+        await message.channel.send(f"🧹 스팸 메시지를 삭제했습니다. (사유: {reason})", delete_after=5)
 
     async def _timeout_member(self, member: discord.Member, reason: str) -> None:
-        until = dt.datetime.utcnow() + dt.timedelta(minutes=10)
+        until = dt.datetime.now(dt.timezone.utc) + _TIMEOUT_DELTA
         try:
             await member.timeout(until, reason=reason)
             await member.send(f"⏳ {member.guild.name}에서 10분간 타임아웃되었습니다. 사유: {reason}")
@@ -174,19 +245,17 @@ class SpamGuardBot(commands.Bot):
         @self.tree.command(name="spamlog", description="최근 스팸 제재 기록을 확인합니다.")
         @app_commands.checks.has_permissions(manage_guild=True)
         async def slash_spamlog(interaction: discord.Interaction, member: discord.Member):
-            history = self.log_service.fetch_user_history(interaction.guild_id, member.id, limit=5)
+            history = await self.fetch_user_history(interaction.guild_id, member.id, limit=5)
             if not history:
                 await interaction.response.send_message(
                     f"{member.mention}에 대한 제재 기록이 없습니다.", ephemeral=True
                 )
                 return
-            lines = []
-            for entry in history:
-                ts = entry.timestamp.strftime("%m-%d %H:%M")
-                lines.append(
-                    f"[{ts}] {entry.action or 'auto'} pts={entry.points}#{entry.violation_count}: {entry.reason}"
-                )
-            await interaction.response.send_message("\n".join(lines), ephemeral=True)
+            body = "\n".join(
+                f"[{entry.timestamp:%m-%d %H:%M}] {entry.action or 'auto'} pts={entry.points}#{entry.violation_count}: {entry.reason}"
+                for entry in history
+            )
+            await interaction.response.send_message(body, ephemeral=True)
 
         @self.tree.command(name="forgive", description="해당 사용자의 스트라이크를 초기화합니다.")
         @app_commands.checks.has_permissions(manage_guild=True)
@@ -309,7 +378,8 @@ class SpamGuardBot(commands.Bot):
         if not cfg.enabled:
             return False
 
-        report = await self.currency_reporter.build_report()
+        # 예약 실행은 항상 최신 환율을 가져오고, 수동 실행은 캐시된 보고서를 재사용한다.
+        report = await self.currency_reporter.build_report(force_refresh=source == "schedule")
         if not report:
             log.warning("Currency report skipped - no rates fetched")
             return False
@@ -337,23 +407,31 @@ class SpamGuardBot(commands.Bot):
             log.info("No currency report targets available for source %s", source)
             return False
 
-        delivered = False
-        for gid, channel_id in targets:
-            channel = await self._resolve_report_channel(channel_id, guild_id=gid)
-            if not channel:
-                log.warning("Channel %s for guild %s unavailable for currency report.", channel_id, gid)
-                continue
-            try:
-                embed = self._build_currency_embed(report)
-                if embed:
-                    await channel.send(embed=embed)
-                else:
-                    await channel.send(report.text)
-                delivered = True
+        embed = self._build_currency_embed(report)
+        semaphore = asyncio.Semaphore(CURRENCY_SEND_CONCURRENCY)
+
+        async def send_one(gid: int, channel_id: int) -> bool:
+            async with semaphore:
+                channel = self._resolve_report_channel_cached(channel_id, guild_id=gid)
+                if channel is _MISS:
+                    channel = await self._fetch_report_channel(channel_id, guild_id=gid)
+                if not channel:
+                    log.warning("Channel %s for guild %s unavailable for currency report.", channel_id, gid)
+                    return False
+                try:
+                    if embed:
+                        await channel.send(embed=embed)
+                    else:
+                        await channel.send(report.text)
+                except discord.HTTPException:
+                    log.exception("Failed to send currency report to guild=%s channel=%s", gid, channel_id)
+                    return False
                 log.info("Posted currency report to guild=%s channel=%s source=%s", gid, channel_id, source)
-            except discord.HTTPException:
-                log.exception("Failed to send currency report to guild=%s channel=%s", gid, channel_id)
-        return delivered
+                return True
+
+        # 길드별 전송을 동시에 진행하되, 라우트별 rate limit을 고려해 동시 실행 수를 제한한다.
+        results = await asyncio.gather(*(send_one(gid, channel_id) for gid, channel_id in targets))
+        return any(results)
 
     async def trigger_currency_report(
         self,
@@ -363,17 +441,25 @@ class SpamGuardBot(commands.Bot):
     ) -> bool:
         return await self._post_currency_report(guild_id=guild_id, channel_override=channel_id, source=source)
 
-    async def _resolve_report_channel(
+    def _resolve_report_channel_cached(
         self,
         channel_id: int,
         guild_id: Optional[int] = None,
-    ) -> Optional[discord.abc.Messageable]:
+    ) -> Optional[discord.abc.Messageable] | object:
+        """Gateway-cache lookup only. Returns _MISS when the channel must be fetched over HTTP."""
         channel = self.get_channel(channel_id)
-        if isinstance(channel, discord.abc.Messageable):
-            if guild_id and getattr(channel, "guild", None) and channel.guild.id != guild_id:
-                log.warning("Channel %s does not belong to guild %s", channel_id, guild_id)
-                return None
-            return channel
+        if not isinstance(channel, discord.abc.Messageable):
+            return _MISS
+        if guild_id and getattr(channel, "guild", None) and channel.guild.id != guild_id:
+            log.warning("Channel %s does not belong to guild %s", channel_id, guild_id)
+            return None
+        return channel
+
+    async def _fetch_report_channel(
+        self,
+        channel_id: int,
+        guild_id: Optional[int] = None,
+    ) -> Optional[discord.abc.Messageable]:
         try:
             fetched = await self.fetch_channel(channel_id)
         except discord.HTTPException:
@@ -53,17 +53,16 @@ def setup(bot: SpamGuardBot) -> None:
     @bot.command(name="spamlog")
     @commands.has_permissions(manage_guild=True)
     async def spam_log(ctx: commands.Context, member: discord.Member) -> None:
-        history = bot.log_service.fetch_user_history(ctx.guild.id, member.id, limit=5)
+        history = await bot.fetch_user_history(ctx.guild.id, member.id, limit=5)
         if not history:
             await ctx.send(f"{member.mention}에 대한 기록이 없습니다.")
             return
 
-        lines = []
-        for entry in history:
-            ts = entry.timestamp.strftime("%m-%d %H:%M")
-            summary = f"[{ts}] {entry.action or 'auto'} pts={entry.points}#{entry.violation_count}: {entry.reason}"
-            lines.append(summary)
-        await ctx.send("최근 제재 기록:\n" + "\n".join(lines))
+        body = "\n".join(
+            f"[{entry.timestamp:%m-%d %H:%M}] {entry.action or 'auto'} pts={entry.points}#{entry.violation_count}: {entry.reason}"
+            for entry in history
+        )
+        await ctx.send(f"최근 제재 기록:\n{body}")
 
     @bot.command(name="forgive")
     @commands.has_permissions(manage_guild=True)
@@ -82,7 +81,12 @@ async def _process_message(bot: SpamGuardBot, message: discord.Message) -> None:
     if is_privileged(member):
         return
 
-    settings = await bot.fetch_guild_settings(message.guild.id)
+    # 캐시에 있으면 executor를 거치지 않고 바로 사용한다.
+    settings = bot.config_store.try_get_cached(message.guild.id)
+    if settings is None:
+        settings = await bot.fetch_guild_settings(message.guild.id)
+    if not settings.enabled:
+        return
     action = bot.spam_detector.register_message(message, settings)
     if action:
         await bot.process_spam_action(message, action)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import re
 import threading
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Iterable
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session, sessionmaker
 
 from config import SpamDefaults
@@ -22,22 +24,31 @@ class GuildSettings:
     exception_keywords: list[str]
     currency_report_enabled: bool
     currency_report_channel_id: int | None
+    # exception_keywords를 소문자로 합친 단일 정규식. 키워드가 없으면 None.
+    keyword_pattern: re.Pattern[str] | None = field(init=False, repr=False, compare=False)
+    # 신규 계정 판정에 메시지마다 timedelta를 만들지 않도록 미리 계산한 초 단위 값
+    new_user_seconds: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.new_user_seconds = self.new_user_minutes * 60.0
+        self.keyword_pattern = _compile_keywords(self.exception_keywords)
 
     @classmethod
     def from_model(cls, model: GuildConfig) -> "GuildSettings":
-        return cls(
-            guild_id=model.guild_id,
-            enabled=model.enabled,
-            spam_limit=model.spam_limit,
-            time_window=model.time_window,
-            link_block=model.link_block,
-            mention_limit=model.mention_limit,
-            new_user_minutes=model.new_user_minutes,
-            exception_keywords=_split_keywords(model.exception_keywords),
-            currency_report_enabled=model.currency_report_enabled,
-            currency_report_channel_id=model.currency_report_channel_id,
-        )
-
+        # list_all()과 캐시 미스마다 호출되므로 __init__의 키워드 인자 처리를 건너뛰고 슬롯에 직접 대입한다.
+        settings = object.__new__(cls)
+        settings.guild_id = model.guild_id
+        settings.enabled = model.enabled
+        settings.spam_limit = model.spam_limit
+        settings.time_window = model.time_window
+        settings.link_block = model.link_block
+        settings.mention_limit = model.mention_limit
+        settings.new_user_minutes = model.new_user_minutes
+        settings.exception_keywords = model.exception_keywords or []
+        settings.currency_report_enabled = model.currency_report_enabled
+        settings.currency_report_channel_id = model.currency_report_channel_id
+        settings.__post_init__()
+        return settings
 
 class GuildConfigStore:
     """
@@ -48,23 +59,45 @@ class GuildConfigStore:
         self._session_factory = session_factory
         self._defaults = defaults
         self._cache: Dict[int, GuildSettings] = {}
+        self._in_flight: Dict[int, threading.Event] = {}
+        # list_all() 스냅샷. 설정이 바뀌거나 길드가 추가/삭제되면 None으로 무효화한다.
+        self._all_cache: list[GuildSettings] | None = None
+        self._all_cache_version = 0
         self._lock = threading.RLock()
 
     def get_or_create(self, guild_id: int) -> GuildSettings:
-        with self._lock:
-            settings = self._cache.get(guild_id)
-            if settings:
-                return settings
-
-        with self._session_factory() as session:
-            model = session.get(GuildConfig, guild_id)
-            if model is None:
-                model = self._create_default_model(session, guild_id)
-            settings = GuildSettings.from_model(model)
-
-        with self._lock:
-            self._cache[guild_id] = settings
-        return settings
+        while True:
+            with self._lock:
+                settings = self._cache.get(guild_id)
+                if settings:
+                    return settings
+                event = self._in_flight.get(guild_id)
+                if event is None:
+                    event = self._in_flight[guild_id] = threading.Event()
+                    break
+            # 다른 스레드가 같은 길드를 읽는 중이면 그 결과를 기다렸다가 캐시에서 다시 확인한다.
+            event.wait()
+
+        try:
+            with self._session_factory() as session:
+                model = session.get(GuildConfig, guild_id)
+                if model is None:
+                    model = self._create_default_model(session, guild_id)
+                settings = GuildSettings.from_model(model)
+
+            with self._lock:
+                self._cache[guild_id] = settings
+            return settings
+        finally:
+            with self._lock:
+                self._in_flight.pop(guild_id, None)
+            event.set()
+
+    def try_get_cached(self, guild_id: int) -> GuildSettings | None:
+        """
+        Return cached settings without falling back to the database.
+        """
+        return self._cache.get(guild_id)
 
     def update_settings(self, guild_id: int, **kwargs: int | bool) -> GuildSettings:
         with self._session_factory() as session:
@@ -74,7 +107,7 @@ class GuildConfigStore:
             for key, value in kwargs.items():
                 if hasattr(model, key):
                     if key == "exception_keywords":
-                        setattr(model, key, _join_keywords(value))
+                        setattr(model, key, list(value or []))
                     else:
                         setattr(model, key, value)
             session.add(model)
@@ -84,13 +117,37 @@ class GuildConfigStore:
 
         with self._lock:
             self._cache[guild_id] = settings
+            self._invalidate_all_cache()
 
         return settings
 
     def list_all(self) -> Iterable[GuildSettings]:
+        with self._lock:
+            if self._all_cache is not None:
+                return list(self._all_cache)
+            version = self._all_cache_version
+
+        with self._session_factory() as session:
+            stmt = select(GuildConfig).execution_options(yield_per=256)
+            settings_list = [GuildSettings.from_model(cfg) for cfg in session.scalars(stmt)]
+
+        with self._lock:
+            # 조회 도중 설정이 바뀌었다면 오래된 스냅샷을 캐시에 넣지 않는다.
+            if version == self._all_cache_version:
+                self._all_cache = settings_list
+                for settings in settings_list:
+                    self._cache[settings.guild_id] = settings
+        return list(settings_list)
+
+    def list_guild_ids(self) -> list[int]:
+        """
+        Return every configured guild id without hydrating full settings rows.
+        """
+        with self._lock:
+            if self._all_cache is not None:
+                return [settings.guild_id for settings in self._all_cache]
         with self._session_factory() as session:
-            configs = session.query(GuildConfig).all()
-            return [GuildSettings.from_model(cfg) for cfg in configs]
+            return list(session.scalars(select(GuildConfig.guild_id)))
 
     def delete_guild(self, guild_id: int) -> None:
         with self._session_factory() as session:
@@ -100,6 +157,7 @@ class GuildConfigStore:
                 session.commit()
         with self._lock:
             self._cache.pop(guild_id, None)
+            self._invalidate_all_cache()
 
     def _create_default_model(self, session: Session, guild_id: int) -> GuildConfig:
         model = GuildConfig(
@@ -110,25 +168,29 @@ class GuildConfigStore:
             link_block=self._defaults.link_block,
             mention_limit=self._defaults.mention_limit,
             new_user_minutes=self._defaults.new_user_minutes,
-            exception_keywords=",".join(self._defaults.exception_keywords),
+            exception_keywords=list(self._defaults.exception_keywords),
             currency_report_enabled=False,
             currency_report_channel_id=None,
         )
         session.add(model)
         session.commit()
         session.refresh(model)
+        with self._lock:
+            self._invalidate_all_cache()
         return model
 
+    def _invalidate_all_cache(self) -> None:
+        self._all_cache = None
+        self._all_cache_version += 1
 
-def _split_keywords(raw: str | None) -> list[str]:
-    if not raw:
-        return []
-    return [part.strip() for part in raw.split(",") if part.strip()]
 
-
-def _join_keywords(keywords: list[str] | tuple[str, ...] | str | None) -> str:
-    if keywords is None:
-        return ""
-    if isinstance(keywords, str):
-        return keywords
-    return ",".join(k.strip() for k in keywords if k.strip())
+def _compile_keywords(keywords: list[str]) -> re.Pattern[str] | None:
+    """
+    Compile keywords into one alternation matched against `content.lower()`.
+    """
+    # IGNORECASE 대신 미리 소문자로 바꿔 기존 `keyword.lower() in content.lower()` 판정과 똑같이 맞춘다.
+    # 중복은 제거하고 긴 키워드부터 두어 공통 접두사를 가진 키워드에서 되돌아가는 일을 줄인다.
+    lowered = sorted({keyword.lower() for keyword in keywords if keyword}, key=lambda k: (-len(k), k))
+    if not lowered:
+        return None
+    return re.compile("|".join(re.escape(keyword) for keyword in lowered))
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import datetime as dt
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
 
 import httpx
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
@@ -20,8 +21,12 @@ class CurrencyReportResult:
     quote_currency: str
     values: Dict[str, float]
     timestamp: dt.datetime
+    _embed_dict: Dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
 
     def to_embed_dict(self) -> Dict[str, Any]:
+        # 보고서는 만들어진 뒤 바뀌지 않으므로 embed 데이터도 한 번만 만든다.
+        if self._embed_dict is not None:
+            return self._embed_dict
         fields = []
         for code, amount in self.values.items():
             fields.append({
@@ -34,7 +39,7 @@ class CurrencyReportResult:
                 "value": "\u200b",
                 "inline": False,
             })
-        return {
+        self._embed_dict = {
             "title": "환율 리포트",
             "description": f"{self.header}\n기준 통화: 1 {self.quote_currency}",
             "color": 0x2ecc71,
@@ -44,6 +49,7 @@ class CurrencyReportResult:
                 "text": "자동 환율 업데이트",
             },
         }
+        return self._embed_dict
 
 
 class CurrencyReporter:
@@ -51,19 +57,39 @@ class CurrencyReporter:
 
     def __init__(self, config: CurrencyReportConfig):
         self.config = config
-
-    async def build_report(self) -> CurrencyReportResult | None:
+        self._tz = self._resolve_timezone()
+        self._quote_upper = config.quote_currency.upper()
+        self._currency_upper = tuple(code.upper() for code in config.currencies)
+        # 예약 실행마다 TCP/TLS 연결을 새로 맺지 않도록 클라이언트를 재사용한다.
+        self._client: httpx.AsyncClient | None = None
+        # (monotonic 저장 시각, (기준 통화, 대상 통화들), 보고서). 여러 길드의 수동 요청이 한 번의 API 호출을 공유한다.
+        self._cache: Tuple[float, Tuple[str, Tuple[str, ...]], CurrencyReportResult] | None = None
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def build_report(self, force_refresh: bool = False) -> CurrencyReportResult | None:
         if not self.config.currencies:
             return None
 
+        key = (self._quote_upper, self._currency_upper)
+        if not force_refresh and self._cache is not None:
+            cached_at, cached_key, cached_report = self._cache
+            if cached_key == key and time.monotonic() - cached_at < self.config.cache_ttl_seconds:
+                return cached_report
+
         rates = await self._fetch_rates()
         if not rates:
             return None
-        return self._render_report(rates)
+        report = self._render_report(rates)
+        self._cache = (time.monotonic(), key, report)
+        return report
 
     async def _fetch_rates(self) -> Dict[str, float]:
-        base_code = self.config.quote_currency.upper()
-        symbols = ",".join(code.upper() for code in self.config.currencies)
+        base_code = self._quote_upper
+        symbols = ",".join(self._currency_upper)
         url = self.config.api_url.format(
             base=base_code,
             quote=base_code,
@@ -79,11 +105,15 @@ class CurrencyReporter:
         if self.config.api_key and "{api_key}" not in self.config.api_url:
             params["access_key"] = self.config.api_key
 
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=15,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                response = await client.get(url, params=params or None)
-                response.raise_for_status()
-                payload = response.json()
+            response = await self._client.get(url, params=params or None)
+            response.raise_for_status()
+            payload = response.json()
         except httpx.HTTPError:
             log.exception("Failed to fetch FX rates from %s", self.config.api_url)
             return {}
@@ -93,35 +123,34 @@ class CurrencyReporter:
             log.warning("Currency API payload missing rates: %s", payload)
             return {}
         cleaned: Dict[str, float] = {}
-        for code in self.config.currencies:
-            value = rates.get(code.upper())
+        for code in self._currency_upper:
+            value = rates.get(code)
             if isinstance(value, (int, float)) and value > 0:
-                cleaned[code.upper()] = float(value)
+                cleaned[code] = float(value)
         return cleaned
 
     def _render_report(self, rates: Dict[str, float]) -> CurrencyReportResult:
-        tz = self._resolve_timezone()
-        now = dt.datetime.now(tz)
+        now = dt.datetime.now(self._tz)
         header = now.strftime(f"%Y-%m-%d %H:%M {self.config.timezone} 기준 환율")
         lines = [
             f"{header}",
-            f"기준 통화: 1 {self.config.quote_currency.upper()}",
+            f"기준 통화: 1 {self._quote_upper}",
             "",
         ]
 
         display_values: Dict[str, float] = {}
-        for code in self.config.currencies:
-            rate = rates.get(code.upper())
+        for code in self._currency_upper:
+            rate = rates.get(code)
             if rate is None or rate == 0:
                 continue
             quote_value = 1 / rate
-            display_values[code.upper()] = quote_value
-            lines.append(f"- 1 {code.upper()} ≈ {quote_value:,.2f} {self.config.quote_currency.upper()}")
+            display_values[code] = quote_value
+            lines.append(f"- 1 {code} ≈ {quote_value:,.2f} {self._quote_upper}")
 
         return CurrencyReportResult(
             text="\n".join(lines),
             header=header,
-            quote_currency=self.config.quote_currency.upper(),
+            quote_currency=self._quote_upper,
             values=display_values,
             timestamp=now,
         )
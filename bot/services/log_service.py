@@ -1,17 +1,36 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import List
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Tuple
 
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import func
+from sqlalchemy import func, insert
 
 from db.models import SpamLog
 
+log = logging.getLogger(__name__)
+
+# insertmanyvalues 페이지 크기와 맞춘 한 번의 INSERT당 최대 행 수
+LOG_INSERT_BATCH_SIZE = 500
+# fetch_user_points 집계 결과를 재사용하는 시간(초). 새 로그가 기록되면 해당 길드는 즉시 무효화된다.
+USER_POINTS_CACHE_TTL_SECONDS = 30.0
+# DB 장애 중 메모리에 쌓아 둘 수 있는 최대 행 수. 넘치면 가장 오래된 행부터 버린다.
+LOG_PENDING_MAX_ROWS = 50_000
+
 
 class SpamLogService:
     def __init__(self, session_factory: sessionmaker):
         self._session_factory = session_factory
+        # 아직 기록되지 않은 로그 행. flush()가 한 번에 INSERT한다.
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        # 상한을 넘어 버려진 행 수. 다음 flush()에서 경고로 남기고 초기화한다.
+        self._dropped = 0
+        # (guild_id, limit) -> (만료 monotonic 시각, 집계 행)
+        self._points_cache: Dict[Tuple[int, int], Tuple[float, List[Dict[str, int]]]] = {}
 
     def log_violation(
         self,
@@ -23,18 +42,66 @@ class SpamLogService:
         points: int = 0,
         violation_count: int = 0,
     ) -> None:
-        entry = SpamLog(
-            guild_id=guild_id,
-            user_id=user_id,
-            reason=reason,
-            details=details,
-            action=action,
-            points=points,
-            violation_count=violation_count,
-            timestamp=dt.datetime.now(),
-        )
+        """
+        Queue a log row without touching the database. Rows are written by flush().
+        """
+        row = _log_row(guild_id, user_id, reason, details, action, points, violation_count)
+        with self._pending_lock:
+            self._pending.append(row)
+            self._trim_pending()
+
+    def write_violation(
+        self,
+        guild_id: int,
+        user_id: int,
+        reason: str,
+        details: str | None = None,
+        action: str | None = None,
+        points: int = 0,
+        violation_count: int = 0,
+    ) -> None:
+        """
+        Insert a single log row right away, bypassing the queue. Blocking; call it off the event loop.
+        """
+        self.log_violations([_log_row(guild_id, user_id, reason, details, action, points, violation_count)])
+        self._invalidate_points({guild_id})
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write all queued rows in batches of LOG_INSERT_BATCH_SIZE and return how many were written.
+        Rows that were not committed are put back in front of the queue.
+        """
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            log.warning("Dropped %d queued spam logs over the %d row limit", dropped, LOG_PENDING_MAX_ROWS)
+        written = 0
+        try:
+            for start in range(0, len(rows), LOG_INSERT_BATCH_SIZE):
+                batch = rows[start:start + LOG_INSERT_BATCH_SIZE]
+                self.log_violations(batch)
+                # 커밋된 배치는 다시 넣지 않도록 무효화 전에 기록해 둔다.
+                written = start + len(batch)
+                self._invalidate_points({row["guild_id"] for row in batch})
+        except Exception:
+            with self._pending_lock:
+                self._pending[:0] = rows[written:]
+                self._trim_pending()
+            raise
+        return len(rows)
+
+    def log_violations(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert several log rows with a single multi-row INSERT.
+        """
+        if not rows:
+            return
         with self._session_factory() as session:
-            session.add(entry)
+            session.execute(insert(SpamLog), rows)
             session.commit()
 
     def fetch_logs(self, guild_id: int, limit: int = 50) -> List[SpamLog]:
@@ -50,7 +117,13 @@ class SpamLogService:
     def fetch_user_points(self, guild_id: int, limit: int = 200):
         """
         Aggregate per-user spam points for a guild from the log history.
+        Results are cached for USER_POINTS_CACHE_TTL_SECONDS or until the guild gets new rows.
         """
+        key = (guild_id, limit)
+        cached = self._points_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+
         with self._session_factory() as session:
             rows = (
                 session.query(
@@ -65,7 +138,7 @@ class SpamLogService:
                 .limit(limit)
                 .all()
             )
-            return [
+            result = [
                 {
                     "user_id": row.user_id,
                     "points": int(row.points),
@@ -74,6 +147,8 @@ class SpamLogService:
                 }
                 for row in rows
             ]
+        self._points_cache[key] = (time.monotonic() + USER_POINTS_CACHE_TTL_SECONDS, result)
+        return list(result)
 
     def fetch_action_logs(self, guild_id: int, action: str, limit: int = 50) -> List[SpamLog]:
         with self._session_factory() as session:
@@ -94,3 +169,36 @@ class SpamLogService:
                 .limit(limit)
             )
             return list(query)
+
+    def _trim_pending(self) -> None:
+        # _pending_lock을 잡은 상태에서만 호출한다.
+        overflow = len(self._pending) - LOG_PENDING_MAX_ROWS
+        if overflow > 0:
+            del self._pending[:overflow]
+            self._dropped += overflow
+
+    def _invalidate_points(self, guild_ids: set[int]) -> None:
+        # fetch_user_points가 웹 스레드풀에서 동시에 키를 추가하므로 스냅샷을 떠서 순회한다.
+        for key in [key for key in tuple(self._points_cache) if key[0] in guild_ids]:
+            self._points_cache.pop(key, None)
+
+
+def _log_row(
+    guild_id: int,
+    user_id: int,
+    reason: str,
+    details: str | None,
+    action: str | None,
+    points: int,
+    violation_count: int,
+) -> Dict[str, Any]:
+    return {
+        "guild_id": guild_id,
+        "user_id": user_id,
+        "reason": reason,
+        "details": details,
+        "action": action,
+        "points": points,
+        "violation_count": violation_count,
+        "timestamp": dt.datetime.now(),
+    }
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import datetime as dt
-from collections import deque
+import re
+import time
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Deque, Dict, Optional, Tuple
+from typing import Optional, Tuple
 
 import discord
 
@@ -13,6 +15,10 @@ from bot.services.violation_tracker import ViolationTracker
 from bot.utils.message_analysis import contains_link, count_mentions, is_similar, normalize_content
 
 
+# 메시지 기록을 유지할 최대 (길드, 사용자) 수. 넘치면 가장 오래 조용했던 사용자부터 지운다.
+HISTORY_MAX_USERS = 100_000
+
+
 class SpamActionType(str, Enum):
     NONE = "none"
     WARN = "warn"
@@ -21,6 +27,16 @@ class SpamActionType(str, Enum):
     KICK = "kick"
 
 
+# 누적 위반 횟수(0~4, 4 이상은 4로 자름)별 제재 단계
+_ACTIONS_BY_COUNT = (
+    SpamActionType.WARN,
+    SpamActionType.WARN,
+    SpamActionType.DELETE,
+    SpamActionType.TIMEOUT,
+    SpamActionType.KICK,
+)
+
+
 @dataclass(slots=True)
 class SpamAction:
     action: SpamActionType
@@ -29,17 +45,53 @@ class SpamAction:
     violation_count: int = 0
 
 
-@dataclass(slots=True)
-class MessageRecord:
-    timestamp: dt.datetime
-    content: str
-    normalized: str
+class MessageRing:
+    """
+    Fixed-capacity ring buffer of a user's recent messages, stored column-wise
+    (monotonic timestamps and normalized text). head/tail only ever increase; the
+    physical slot is index % capacity, so expiring or overwriting never shifts items.
+    """
+
+    __slots__ = ("_capacity", "_timestamps", "_normalized", "_head", "_tail", "idle_until")
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        # 이 시각이 지나면 모든 메시지가 시간 창 밖이므로 기록을 통째로 버려도 판정이 바뀌지 않는다.
+        self.idle_until = 0.0
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._normalized: list[str] = [""] * capacity
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def append(self, timestamp: float, normalized: str) -> None:
+        if self._tail - self._head == self._capacity:
+            # 가득 차면 deque(maxlen)처럼 가장 오래된 항목을 덮어쓴다.
+            self._head += 1
+        slot = self._tail % self._capacity
+        self._timestamps[slot] = timestamp
+        self._normalized[slot] = normalized
+        self._tail += 1
+
+    def expire(self, now: float, window: float) -> None:
+        """Drop messages older than `window` seconds relative to `now`."""
+        timestamps = self._timestamps
+        capacity = self._capacity
+        while self._head < self._tail and now - timestamps[self._head % capacity] > window:
+            self._head += 1
+
+    def normalized_from_end(self, offset: int) -> str:
+        """Normalized text of the message `offset` positions before the newest (0 = newest)."""
+        return self._normalized[(self._tail - 1 - offset) % self._capacity]
 
 
 class SpamDetector:
     def __init__(self, violation_tracker: ViolationTracker):
         self._violation_tracker = violation_tracker
-        self._history: Dict[Tuple[int, int], Deque[MessageRecord]] = {}
+        # 최근 사용 순서(LRU)로 정렬된 사용자별 기록
+        self._history: OrderedDict[Tuple[int, int], MessageRing] = OrderedDict()
 
     def register_message(self, message: discord.Message, config: GuildSettings) -> Optional[SpamAction]:
         guild = message.guild
@@ -47,15 +99,18 @@ class SpamDetector:
         if not guild or not isinstance(author, discord.Member):
             return None
         key = (guild.id, author.id)
-        now = dt.datetime.utcnow()
+        now = time.monotonic()
         normalized = normalize_content(message.content)
 
-        history = self._history.setdefault(key, deque(maxlen=max(config.spam_limit * 2, 20)))
-        history.append(MessageRecord(timestamp=now, content=message.content, normalized=normalized))
-
-        window = dt.timedelta(seconds=config.time_window)
-        while history and now - history[0].timestamp > window:
-            history.popleft()
+        try:
+            history = self._history[key]
+            self._history.move_to_end(key)
+        except KeyError:
+            self._evict_idle(now)
+            history = self._history[key] = MessageRing(max(config.spam_limit * 2, 20))
+        history.append(now, normalized)
+        history.expire(now, config.time_window)
+        history.idle_until = now + config.time_window
 
         violation_reason, forced_action = self._detect_violation(message, history, config)
         if violation_reason is None:
@@ -71,10 +126,19 @@ class SpamDetector:
             violation_count=count,
         )
 
+    def _evict_idle(self, now: float) -> None:
+        history = self._history
+        # 앞쪽일수록 오래 조용했던 사용자이므로, 아직 유효한 기록을 만나면 멈춘다.
+        while history:
+            oldest = next(iter(history.values()))
+            if oldest.idle_until > now and len(history) < HISTORY_MAX_USERS:
+                break
+            history.popitem(last=False)
+
     def _detect_violation(
         self,
         message: discord.Message,
-        history: Deque[MessageRecord],
+        history: MessageRing,
         config: GuildSettings,
     ) -> Tuple[Optional[str], Optional[SpamActionType]]:
         if not config.enabled:
@@ -87,8 +151,6 @@ class SpamDetector:
         if len(history) > config.spam_limit:
             return "메시지 도배 감지", None
 
-        has_link = contains_link(message.content)
-
         mentions = count_mentions(message)
         if config.mention_limit and mentions >= config.mention_limit:
             return "멘션 스팸 감지", None
@@ -96,62 +158,56 @@ class SpamDetector:
         if self._has_duplicate_content(history):
             return "동일/유사 메시지 반복", None
 
-        if not self._is_ai_exempt(message.content, config.exception_keywords) and self._has_ai_like_similarity(history):
+        if not self._is_ai_exempt(message.content, config.keyword_pattern) and self._has_ai_like_similarity(history):
             return "AI 유사도 스팸 감지", None
 
         member = message.author
-        now = dt.datetime.utcnow()
         if isinstance(member, discord.Member):
-            account_age = now - member.created_at.replace(tzinfo=None)
+            # created_at/joined_at은 UTC aware datetime이므로 epoch 초로 바꿔 float끼리 비교한다.
+            now = time.time()
+            account_age = now - member.created_at.timestamp()
             if member.joined_at:
-                join_age = now - member.joined_at.replace(tzinfo=None)
+                join_age = now - member.joined_at.timestamp()
             else:
                 join_age = account_age
-            min_age = dt.timedelta(minutes=config.new_user_minutes)
+            min_age = config.new_user_seconds
             is_new = account_age < min_age or join_age < min_age
-            if is_new and (has_link or mentions >= 2 or len(history) >= config.spam_limit):
+            # 링크 정규식은 신규 계정일 때만, 정수 비교로 판정이 안 날 때만 돌린다.
+            if is_new and (
+                mentions >= 2 or len(history) >= config.spam_limit or contains_link(message.content)
+            ):
                 return "신규 계정 보호 정책 위반", None
 
         return None, None
 
-    def _has_duplicate_content(self, history: Deque[MessageRecord]) -> bool:
+    def _has_duplicate_content(self, history: MessageRing) -> bool:
         if len(history) < 3:
             return False
-        recent = list(history)[-3:]
-        base = recent[-1].normalized
-        duplicates = sum(1 for record in recent[:-1] if is_similar(base, record.normalized))
+        base = history.normalized_from_end(0)
+        duplicates = sum(1 for offset in (1, 2) if is_similar(base, history.normalized_from_end(offset)))
         return duplicates >= 2
 
-    def _has_ai_like_similarity(self, history: Deque[MessageRecord]) -> bool:
+    def _has_ai_like_similarity(self, history: MessageRing) -> bool:
         """
         Detects when a user sends several highly similar messages that are not exact duplicates.
         This is a lightweight stand-in for AI-based similarity scoring.
         """
         if len(history) < 4:
             return False
-        recent = list(history)[-4:]
-        target = recent[-1].normalized
+        target = history.normalized_from_end(0)
         similarity_hits = 0
-        for record in recent[:-1]:
-            if is_similar(target, record.normalized, threshold=0.85):
+        for offset in (1, 2, 3):
+            if is_similar(target, history.normalized_from_end(offset), threshold=0.85):
                 similarity_hits += 1
         return similarity_hits >= 2
 
-    def _is_ai_exempt(self, content: str, exception_keywords: list[str]) -> bool:
-        base = content.lower()
-        for keyword in exception_keywords:
-            if keyword.lower() in base:
-                return True
-        return False
+    def _is_ai_exempt(self, content: str, keyword_pattern: re.Pattern[str] | None) -> bool:
+        if keyword_pattern is None:
+            return False
+        return keyword_pattern.search(content.lower()) is not None
 
     def reset_user(self, guild_id: int, user_id: int) -> None:
         self._violation_tracker.reset(guild_id, user_id)
 
     def _action_for_count(self, count: int) -> SpamActionType:
-        if count <= 1:
-            return SpamActionType.WARN
-        if count == 2:
-            return SpamActionType.DELETE
-        if count == 3:
-            return SpamActionType.TIMEOUT
-        return SpamActionType.KICK
+        return _ACTIONS_BY_COUNT[min(max(count, 0), 4)]
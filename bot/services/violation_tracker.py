@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import datetime as dt
+import time
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class ViolationRecord:
     count: int
-    last_triggered: dt.datetime
-    last_decay_check: dt.datetime
+    # time.monotonic() 기준 정수 초
+    last_triggered: int
+    last_decay_check: int
 
 
 class ViolationTracker:
@@ -20,24 +21,24 @@ class ViolationTracker:
 
     def __init__(self, decay_hours: int = 24):
         self._records: dict[tuple[int, int], ViolationRecord] = {}
-        self._decay_after = dt.timedelta(hours=decay_hours)
+        self._decay_after_seconds = max(1, int(decay_hours * 3600))
 
     def increment(self, guild_id: int, user_id: int) -> int:
-        now = dt.datetime.utcnow()
+        now = int(time.monotonic())
         key = (guild_id, user_id)
         record = self._records.get(key)
         if record:
             # If the user has been quiet, slowly decay strikes so rare false positives reset.
             elapsed = now - record.last_decay_check
-            if elapsed >= self._decay_after:
-                decay_steps = int(elapsed // self._decay_after)
+            if elapsed >= self._decay_after_seconds:
+                decay_steps = elapsed // self._decay_after_seconds
                 record.count = max(0, record.count - decay_steps)
                 record.last_decay_check = now
         if record is None or record.count <= 0:
             record = ViolationRecord(count=0, last_triggered=now, last_decay_check=now)
+            self._records[key] = record
         record.count += 1
         record.last_triggered = now
-        self._records[key] = record
         return record.count
 
     def reset(self, guild_id: int, user_id: int) -> None:
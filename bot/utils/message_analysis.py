@@ -6,18 +6,45 @@ from difflib import SequenceMatcher
 
 import discord
 
-URL_PATTERN = re.compile(
-    r"(https?:\/\/|www\.)[^\s]+|discord\.gg\/[^\s]+",
-    re.IGNORECASE,
-)
+try:
+    # google-re2가 설치되어 있으면 되돌아가기 없는 선형 시간 엔진으로 링크를 찾는다. 없으면 표준 re를 쓴다.
+    import re2 as _url_re
+except ImportError:
+    _url_re = re
+
+try:
+    # rapidfuzz가 있으면 C++ 구현의 유사도 계산을 쓰고, 없으면 difflib.SequenceMatcher로 계산한다.
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+except ImportError:
+    _fuzz_ratio = None
+
+# 플래그 인자는 두 엔진의 API가 달라 인라인 (?i)로 대소문자를 무시한다.
+URL_PATTERN = _url_re.compile(r"(?i)(https?:\/\/|www\.)[^\s]+|discord\.gg\/[^\s]+")
+# @everyone/@here를 한 번의 스캔으로 찾는다.
+MASS_MENTION_PATTERN = re.compile(r"@everyone|@here")
+
+
+class _ControlCharTable(dict):
+    """
+    str.translate table that drops Unicode control/format/unassigned characters (category C*).
+    Entries are filled lazily on first sight, so lookups after warm-up stay in C.
+    """
+
+    max_entries = 65536
+
+    def __missing__(self, codepoint: int) -> int | None:
+        value = None if unicodedata.category(chr(codepoint)).startswith("C") else codepoint
+        if len(self) < self.max_entries:
+            self[codepoint] = value
+        return value
+
+
+_CONTROL_CHAR_TABLE = _ControlCharTable()
 
 
 def normalize_content(content: str) -> str:
-    text = unicodedata.normalize("NFKD", content)
-    text = "".join(ch for ch in text if not unicodedata.category(ch).startswith("C"))
-    text = text.lower().strip()
-    text = re.sub(r"\s+", " ", text)
-    return text
+    text = unicodedata.normalize("NFKD", content).translate(_CONTROL_CHAR_TABLE)
+    return " ".join(text.lower().split())
 
 
 def contains_link(content: str) -> bool:
@@ -28,10 +55,23 @@ def count_mentions(message: discord.Message) -> int:
     count = len(message.mentions) + len(message.role_mentions)
     if message.mention_everyone:
         count += 1
-    count += message.content.count("@everyone") + message.content.count("@here")
+    count += len(MASS_MENTION_PATTERN.findall(message.content))
     return count
 
 
 def is_similar(a: str, b: str, threshold: float = 0.9) -> bool:
     """Fuzzy match helper for near-identical content."""
-    return SequenceMatcher(None, a, b).ratio() >= threshold
+    # 도배는 대부분 정규화 후 완전히 같은 문자열이므로 비교 행렬을 만들기 전에 먼저 확인한다.
+    if a == b:
+        return True
+    # 길이만으로 구한 상한(real_quick_ratio와 같은 식)이 임계값에 못 미치면 SequenceMatcher를 만들지 않는다.
+    len_a, len_b = len(a), len(b)
+    if 2.0 * min(len_a, len_b) / (len_a + len_b) < threshold:
+        return False
+    if _fuzz_ratio is not None:
+        # score_cutoff 아래로 떨어질 것이 확실해지면 rapidfuzz가 계산을 중단하고 0을 돌려준다.
+        cutoff = threshold * 100
+        return _fuzz_ratio(a, b, score_cutoff=cutoff) >= cutoff
+    matcher = SequenceMatcher(None, a, b)
+    # quick_ratio는 문자 빈도만 보는 O(n) 상한이라 전체 매칭 전에 대부분의 다른 문장을 걸러낸다.
+    return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import bisect
 import datetime as dt
+import functools
 import logging
-from typing import List
+from typing import Tuple
 
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
@@ -11,31 +13,38 @@ from config import CurrencyReportConfig
 log = logging.getLogger(__name__)
 
 
-def generate_schedule_times(config: CurrencyReportConfig) -> List[dt.time]:
+def generate_schedule_times(config: CurrencyReportConfig) -> Tuple[dt.time, ...]:
     """
     Generate timezone-aware times for one day based on the configured start time and interval.
     These times are used by discord.ext.tasks.loop to trigger jobs every day.
     """
-    tz = _resolve_timezone(config.timezone)
-    interval = max(1, config.interval_minutes)
-    start_minutes = _normalize_minutes(config.hour, config.minute)
-    minutes = start_minutes
+    return _schedule_times_cached(config.hour, config.minute, config.interval_minutes, config.timezone)
+
+
+@functools.lru_cache(maxsize=32)
+def _schedule_times_cached(hour: int, minute: int, interval_minutes: int, tz_name: str) -> Tuple[dt.time, ...]:
+    # 스케줄은 네 값만으로 결정되므로 캐시하고, 호출자가 캐시를 변경하지 못하게 튜플로 돌려준다.
+    tz = _resolve_timezone(tz_name)
+    return tuple(
+        dt.time(hour=value // 60, minute=value % 60, tzinfo=tz)
+        for value in _schedule_minutes_cached(hour, minute, interval_minutes)
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _schedule_minutes_cached(hour: int, minute: int, interval_minutes: int) -> Tuple[int, ...]:
+    """Sorted minutes-of-day for the schedule."""
+    interval = max(1, interval_minutes)
+    minutes = _normalize_minutes(hour, minute)
     seen: set[int] = set()
-    times: list[dt.time] = []
 
     while minutes not in seen:
         seen.add(minutes)
-        hour, minute = divmod(minutes, 60)
-        times.append(dt.time(hour=hour, minute=minute, tzinfo=tz))
         minutes = (minutes + interval) % (24 * 60)
         if interval >= 24 * 60:
             break
 
-    if not times:
-        times.append(dt.time(hour=config.hour % 24, minute=config.minute % 60, tzinfo=tz))
-
-    times.sort(key=lambda t: (t.hour, t.minute))
-    return times
+    return tuple(sorted(seen))
 
 
 def compute_next_run(config: CurrencyReportConfig, reference: dt.datetime | None = None) -> dt.datetime:
@@ -45,15 +54,15 @@ def compute_next_run(config: CurrencyReportConfig, reference: dt.datetime | None
     """
     tz = _resolve_timezone(config.timezone)
     now = reference.astimezone(tz) if reference else dt.datetime.now(tz)
-    times = generate_schedule_times(config)
-    for time_obj in times:
-        candidate = dt.datetime.combine(now.date(), dt.time(time_obj.hour, time_obj.minute, tzinfo=tz))
-        if candidate > now:
-            return candidate
-
-    first_time = min(times, key=lambda t: (t.hour, t.minute))
-    next_day = now.date() + dt.timedelta(days=1)
-    return dt.datetime.combine(next_day, dt.time(first_time.hour, first_time.minute, tzinfo=tz))
+    minutes = _schedule_minutes_cached(config.hour, config.minute, config.interval_minutes)
+    # 예약 시각은 초가 0이므로 "현재 분보다 큰 첫 슬롯"이 다음 실행이다.
+    index = bisect.bisect_right(minutes, now.hour * 60 + now.minute)
+    run_date = now.date()
+    if index == len(minutes):
+        index = 0
+        run_date += dt.timedelta(days=1)
+    hour, minute = divmod(minutes[index], 60)
+    return dt.datetime.combine(run_date, dt.time(hour, minute, tzinfo=tz))
 
 
 def _normalize_minutes(hour: int, minute: int) -> int:
@@ -62,6 +71,7 @@ def _normalize_minutes(hour: int, minute: int) -> int:
     return hour * 60 + minute
 
 
+@functools.lru_cache(maxsize=32)
 def _resolve_timezone(tz_name: str) -> dt.tzinfo:
     try:
         return ZoneInfo(tz_name)
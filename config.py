@@ -53,6 +53,7 @@ class CurrencyReportConfig:
     currencies: tuple[str, ...] = ("USD", "JPY", "CNY")
     api_url: str = "https://open.er-api.com/v6/latest/{base}"
     api_key: Optional[str] = None
+    cache_ttl_seconds: int = 300
 
 
 @dataclass(slots=True)
@@ -61,6 +62,7 @@ class AppConfig:
     oauth: OAuthConfig
     dashboard: DashboardConfig
     database_url: str
+    db_pool_size: int = 4
     spam_defaults: SpamDefaults = field(default_factory=SpamDefaults)
     currency_report: CurrencyReportConfig = field(default_factory=CurrencyReportConfig)
     target_guild_id: Optional[int] = None
@@ -103,6 +105,7 @@ def load_config() -> AppConfig:
     )
 
     database_url = os.getenv("DATABASE_URL", "sqlite:///./spam_guard.sqlite3")
+    db_pool_size = max(1, int(os.getenv("DATABASE_POOL_SIZE", "4")))
 
     spam_defaults = SpamDefaults(
         spam_limit=int(os.getenv("DEFAULT_SPAM_LIMIT", "5")),
@@ -127,6 +130,7 @@ def load_config() -> AppConfig:
         currencies=_read_csv("CURRENCY_REPORT_CODES") or ("USD", "JPY", "CNY"),
         api_url=os.getenv("CURRENCY_REPORT_API_URL", "https://open.er-api.com/v6/latest/{base}"),
         api_key=os.getenv("CURRENCY_REPORT_API_KEY"),
+        cache_ttl_seconds=max(0, int(os.getenv("CURRENCY_REPORT_CACHE_TTL_SECONDS", "300"))),
     )
 
     return AppConfig(
@@ -134,6 +138,7 @@ def load_config() -> AppConfig:
         oauth=oauth_config,
         dashboard=dashboard_config,
         database_url=database_url,
+        db_pool_size=db_pool_size,
         spam_defaults=spam_defaults,
         currency_report=currency_report,
         target_guild_id=target_guild_id,
@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime as dt
 from typing import Protocol
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import JSON, BigInteger, Boolean, Column, DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,7 +21,7 @@ class GuildConfig(Base):
     link_block: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     mention_limit: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
     new_user_minutes: Mapped[int] = mapped_column(Integer, default=10, nullable=False)
-    exception_keywords: Mapped[str | None] = mapped_column(Text, default="", nullable=True)
+    exception_keywords: Mapped[list[str] | None] = mapped_column(JSON, default=list, nullable=True)
     currency_report_enabled: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     currency_report_channel_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow, nullable=False)
@@ -36,10 +36,16 @@ class GuildConfig(Base):
 
 class SpamLog(Base):
     __tablename__ = "spam_logs"
+    # fetch_* 쿼리의 (필터 컬럼..., timestamp DESC) 패턴에 맞춘 복합 인덱스. SQLite는 역방향 스캔으로 DESC 정렬을 처리한다.
+    __table_args__ = (
+        Index("ix_spamlog_guild_ts", "guild_id", "timestamp"),
+        Index("ix_spamlog_guild_user_ts", "guild_id", "user_id", "timestamp"),
+        Index("ix_spamlog_guild_action_ts", "guild_id", "action", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    guild_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
-    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
     action: Mapped[str | None] = mapped_column(String(32), nullable=True)
     points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import json
 from collections.abc import Generator
 from typing import Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -20,15 +21,39 @@ def init_engine(database_url: str) -> Engine:
     if _engine is not None:
         return _engine
 
+    is_sqlite = database_url.startswith("sqlite")
     connect_args = {}
-    if database_url.startswith("sqlite"):
+    engine_kwargs = {}
+    if is_sqlite:
         connect_args["check_same_thread"] = False
-
-    _engine = create_engine(database_url, future=True, connect_args=connect_args)
+    else:
+        # 서버 DB는 끊긴 연결을 체크아웃 시점에 걸러내고, 오래된 연결은 주기적으로 교체한다.
+        engine_kwargs["pool_pre_ping"] = True
+        engine_kwargs["pool_recycle"] = 1800
+
+    _engine = create_engine(database_url, future=True, connect_args=connect_args, **engine_kwargs)
+    if is_sqlite:
+        event.listen(_engine, "connect", _apply_sqlite_pragmas)
     _session_factory = sessionmaker(bind=_engine, class_=Session, expire_on_commit=False)
     return _engine
 
 
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    WAL lets dashboard reads proceed while the bot writes logs, and synchronous=NORMAL
+    is safe under WAL while avoiding an fsync on every commit.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-20000")
+    finally:
+        cursor.close()
+
+
 def init_database(database_url: str) -> None:
     engine = init_engine(database_url)
     Base.metadata.create_all(engine)
@@ -51,29 +76,95 @@ def get_session_factory() -> sessionmaker:
     return _session_factory
 
 
+# (컬럼/인덱스 이름, 없을 때 실행할 DDL)
+_SPAM_LOG_COLUMNS = (
+    ("action", "ALTER TABLE spam_logs ADD COLUMN action VARCHAR(32)"),
+    ("points", "ALTER TABLE spam_logs ADD COLUMN points INTEGER NOT NULL DEFAULT 0"),
+    ("violation_count", "ALTER TABLE spam_logs ADD COLUMN violation_count INTEGER NOT NULL DEFAULT 0"),
+)
+_SPAM_LOG_INDEXES = (
+    ("ix_spamlog_guild_ts", "CREATE INDEX IF NOT EXISTS ix_spamlog_guild_ts ON spam_logs (guild_id, timestamp)"),
+    (
+        "ix_spamlog_guild_user_ts",
+        "CREATE INDEX IF NOT EXISTS ix_spamlog_guild_user_ts ON spam_logs (guild_id, user_id, timestamp)",
+    ),
+    (
+        "ix_spamlog_guild_action_ts",
+        "CREATE INDEX IF NOT EXISTS ix_spamlog_guild_action_ts ON spam_logs (guild_id, action, timestamp)",
+    ),
+)
+# 복합 인덱스의 앞부분과 겹치는 단일 컬럼 인덱스는 쓰기 비용만 늘린다.
+_OBSOLETE_SPAM_LOG_INDEXES = ("ix_spam_logs_guild_id", "ix_spam_logs_user_id")
+_GUILD_CONFIG_COLUMNS = (
+    ("exception_keywords", "ALTER TABLE guild_configs ADD COLUMN exception_keywords TEXT DEFAULT '[]'"),
+    (
+        "currency_report_enabled",
+        "ALTER TABLE guild_configs ADD COLUMN currency_report_enabled BOOLEAN NOT NULL DEFAULT 0",
+    ),
+    ("currency_report_channel_id", "ALTER TABLE guild_configs ADD COLUMN currency_report_channel_id BIGINT"),
+)
+
+
 def _run_migrations(engine: Engine) -> None:
     """
     Lightweight, in-place migrations for SQLite deployments without Alembic.
     Adds any newly introduced columns with safe defaults if they are missing.
+    When the schema is already current no write transaction is opened.
     """
     inspector = inspect(engine)
     if not inspector.has_table("spam_logs"):
         return
 
+    pending: list[str] = []
     existing_columns = {col["name"] for col in inspector.get_columns("spam_logs")}
-    with engine.begin() as conn:
-        if "action" not in existing_columns:
-            conn.execute(text("ALTER TABLE spam_logs ADD COLUMN action VARCHAR(32)"))
-        if "points" not in existing_columns:
-            conn.execute(text("ALTER TABLE spam_logs ADD COLUMN points INTEGER NOT NULL DEFAULT 0"))
-        if "violation_count" not in existing_columns:
-            conn.execute(text("ALTER TABLE spam_logs ADD COLUMN violation_count INTEGER NOT NULL DEFAULT 0"))
+    pending.extend(ddl for name, ddl in _SPAM_LOG_COLUMNS if name not in existing_columns)
+    existing_indexes = {index["name"] for index in inspector.get_indexes("spam_logs")}
+    pending.extend(ddl for name, ddl in _SPAM_LOG_INDEXES if name not in existing_indexes)
+    pending.extend(
+        f"DROP INDEX IF EXISTS {name}" for name in _OBSOLETE_SPAM_LOG_INDEXES if name in existing_indexes
+    )
+
+    legacy_keywords: list = []
     if inspector.has_table("guild_configs"):
         existing_cfg_cols = {col["name"] for col in inspector.get_columns("guild_configs")}
-        with engine.begin() as conn:
-            if "exception_keywords" not in existing_cfg_cols:
-                conn.execute(text("ALTER TABLE guild_configs ADD COLUMN exception_keywords TEXT DEFAULT ''"))
-            if "currency_report_enabled" not in existing_cfg_cols:
-                conn.execute(text("ALTER TABLE guild_configs ADD COLUMN currency_report_enabled BOOLEAN NOT NULL DEFAULT 0"))
-            if "currency_report_channel_id" not in existing_cfg_cols:
-                conn.execute(text("ALTER TABLE guild_configs ADD COLUMN currency_report_channel_id BIGINT"))
+        pending.extend(ddl for name, ddl in _GUILD_CONFIG_COLUMNS if name not in existing_cfg_cols)
+        # 새로 추가되는 컬럼은 기본값 '[]'로 채워지므로 기존 컬럼이 있을 때만 옛 형식을 찾는다.
+        if "exception_keywords" in existing_cfg_cols:
+            with engine.connect() as conn:
+                legacy_keywords = _fetch_legacy_keyword_rows(conn)
+
+    if not pending and not legacy_keywords:
+        return
+
+    with engine.begin() as conn:
+        for ddl in pending:
+            conn.execute(text(ddl))
+        _migrate_keywords_to_json(conn, legacy_keywords)
+
+
+def _fetch_legacy_keyword_rows(conn: Connection) -> list:
+    # 옛 쉼표 구분 문자열도 '['로 시작할 수 있으므로 SQL 패턴 대신 실제로 JSON 목록으로 읽히는지 본다.
+    rows = conn.execute(text("SELECT guild_id, exception_keywords FROM guild_configs")).all()
+    return [(guild_id, raw) for guild_id, raw in rows if not _is_json_list(raw)]
+
+
+def _is_json_list(raw: Optional[str]) -> bool:
+    if raw is None:
+        return False
+    try:
+        return isinstance(json.loads(raw), list)
+    except ValueError:
+        return False
+
+
+def _migrate_keywords_to_json(conn: Connection, rows: list) -> None:
+    """
+    exception_keywords used to be stored as a comma separated string.
+    Rewrite any such rows into the JSON list representation once.
+    """
+    for guild_id, raw in rows:
+        keywords = [part.strip() for part in (raw or "").split(",") if part.strip()]
+        conn.execute(
+            text("UPDATE guild_configs SET exception_keywords = :keywords WHERE guild_id = :guild_id"),
+            {"keywords": json.dumps(keywords, ensure_ascii=False), "guild_id": guild_id},
+        )
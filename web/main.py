@@ -1,29 +1,47 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import httpx
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.sessions import SessionMiddleware
 from starlette.templating import Jinja2Templates
 
 from bot.services.config_service import GuildConfigStore
+from bot.services.currency_reporter import CurrencyReporter
 from bot.services.log_service import SpamLogService
 from config import AppConfig
-from web.routes import auth, dashboard
+from web.routes import auth, dashboard, events
 from web.utils.discord_oauth import DiscordOAuthClient
+from web.utils.event_hub import get_hub
+from web.utils.session import SessionMiddleware
 
 
 def create_app(app_config: AppConfig, config_store: GuildConfigStore, log_service: SpamLogService) -> FastAPI:
-    app = FastAPI(title="Spam Guard Dashboard")
+    currency_reporter = CurrencyReporter(app_config.currency_report)
+    oauth_client = DiscordOAuthClient(app_config.oauth)
+    # 환율 리포트 전송 등 OAuth 클라이언트 밖의 디스코드 호출이 함께 쓰는 클라이언트
+    http_client = httpx.AsyncClient(timeout=15)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await get_hub().close()
+        await currency_reporter.aclose()
+        await oauth_client.aclose()
+        await http_client.aclose()
+
+    app = FastAPI(title="Spam Guard Dashboard", lifespan=lifespan)
     template_dir = Path(__file__).parent / "templates"
     static_dir = Path(__file__).parent / "static"
 
     app.state.config = app_config
     app.state.config_store = config_store
     app.state.log_service = log_service
+    app.state.currency_reporter = currency_reporter
+    app.state.http_client = http_client
     app.state.templates = Jinja2Templates(directory=str(template_dir))
-    oauth_client = DiscordOAuthClient(app_config.oauth)
     # 봇 토큰을 OAuth 클라이언트에 주입해 멤버 조회 시 재사용한다.
     oauth_client.bot_token = app_config.discord.token
     app.state.oauth_client = oauth_client
@@ -32,6 +50,7 @@ def create_app(app_config: AppConfig, config_store: GuildConfigStore, log_servic
 
     app.include_router(auth.router)
     app.include_router(dashboard.router)
+    app.add_route("/events", events.sse_endpoint, methods=["GET"])
 
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
@@ -1,3 +1,3 @@
-from . import auth, dashboard
+from . import auth, dashboard, events
 
-__all__ = ["auth", "dashboard"]
+__all__ = ["auth", "dashboard", "events"]
@@ -2,26 +2,53 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
+import functools
 import logging
+import time
+from dataclasses import dataclass
+from heapq import nlargest
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
-from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse
+from fastapi.responses import RedirectResponse, HTMLResponse
+from starlette.concurrency import run_in_threadpool
 import httpx
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from bot.services.config_service import GuildConfigStore
+from bot.services.config_service import GuildConfigStore, GuildSettings
 from bot.services.currency_reporter import CurrencyReporter, CurrencyReportResult
 from bot.utils.schedule import compute_next_run
 from bot.services.log_service import SpamLogService
-from config import AppConfig
+from config import AppConfig, CurrencyReportConfig
+from db.models import SpamLog
 from web.utils.discord_oauth import DiscordOAuthClient
-from web.utils.event_hub import event_hub
+from web.utils.json_codec import dumps
+from web.utils.ttl_lru import TtlLru
 
 router = APIRouter(tags=["dashboard"])
 log = logging.getLogger(__name__)
 CHANNEL_CACHE_TTL_SECONDS = 300
-CHANNEL_CACHE: Dict[int, Dict[str, Any]] = {}
+CHANNEL_CACHE_MAXSIZE = 1024
+INDEX_LOG_LIMIT = 30
+# 다음 환율 리포트 시각 표시값. 그 시각이 지나기 전까지는 다시 계산하지 않는다.
+_NEXT_RUN_CACHE: Dict[str, Any] = {"key": None, "expires": 0.0, "iso": None, "display": None}
+CHANNEL_CACHE: TtlLru[list[Dict[str, Any]]] = TtlLru(maxsize=CHANNEL_CACHE_MAXSIZE, ttl=CHANNEL_CACHE_TTL_SECONDS)
+
+
+@dataclass(slots=True)
+class GuildSummary:
+    info: Dict[str, Any]
+    settings: GuildSettings
+
+
+@dataclass(slots=True)
+class LogRow:
+    guild: Dict[str, Any]
+    log: SpamLog
+
+
+def _log_row_timestamp(row: LogRow) -> dt.datetime:
+    return row.log.timestamp
 
 
 def get_templates(request: Request):
@@ -44,6 +71,14 @@ def get_oauth_client(request: Request) -> DiscordOAuthClient:
     return request.app.state.oauth_client
 
 
+def get_currency_reporter(request: Request) -> CurrencyReporter:
+    return request.app.state.currency_reporter
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
+
+
 def require_session_user(request: Request) -> Dict[str, Any]:
     user = request.session.get("user")
     if not user:
@@ -65,25 +100,33 @@ async def _fetch_guild_text_channels(
     oauth_client: DiscordOAuthClient,
     bot_token: str,
 ) -> list[Dict[str, Any]]:
-    entry = CHANNEL_CACHE.get(guild_id)
-    now = dt.datetime.utcnow().timestamp()
-    if entry:
-        ts = entry.get("ts", 0)
-        channels = entry.get("channels")
-        if isinstance(ts, (int, float)) and isinstance(channels, list) and now - ts < CHANNEL_CACHE_TTL_SECONDS:
-            return channels
-    channels_raw = await oauth_client.fetch_guild_channels(guild_id, bot_token)
-    text_channels = []
-    for ch in channels_raw:
-        if ch.get("type") == 0:
-            text_channels.append({
-                "id": str(ch.get("id")),
-                "name": ch.get("name", f"channel-{ch.get('id')}"),
-            })
-    CHANNEL_CACHE[guild_id] = {"ts": now, "channels": text_channels}
-    return text_channels
-
-
+    async def load() -> list[Dict[str, Any]]:
+        channels_raw = await oauth_client.fetch_guild_channels(guild_id, bot_token)
+        text_channels = []
+        for ch in channels_raw:
+            if ch.get("type") == 0:
+                text_channels.append({
+                    "id": str(ch.get("id")),
+                    "name": ch.get("name", f"channel-{ch.get('id')}"),
+                })
+        return text_channels
+
+    # 같은 길드를 동시에 열어도 디스코드 채널 조회는 한 번만 나간다.
+    return await CHANNEL_CACHE.get_or_set(guild_id, load)
+
+
+def _currency_next_run(cfg: CurrencyReportConfig) -> tuple[str, str]:
+    key = (cfg.hour, cfg.minute, cfg.interval_minutes, cfg.timezone)
+    if _NEXT_RUN_CACHE["key"] == key and time.time() < _NEXT_RUN_CACHE["expires"]:
+        return _NEXT_RUN_CACHE["iso"], _NEXT_RUN_CACHE["display"]
+    next_run_dt = compute_next_run(cfg)
+    iso = next_run_dt.astimezone(dt.timezone.utc).isoformat()
+    display = next_run_dt.astimezone(_resolve_timezone(cfg.timezone)).strftime("%Y-%m-%d %H:%M %Z")
+    _NEXT_RUN_CACHE.update(key=key, expires=next_run_dt.timestamp(), iso=iso, display=display)
+    return iso, display
+
+
+@functools.lru_cache(maxsize=32)
 def _resolve_timezone(tz_name: str) -> dt.tzinfo:
     try:
         return ZoneInfo(tz_name)
@@ -93,41 +136,6 @@ def _resolve_timezone(tz_name: str) -> dt.tzinfo:
         return dt.timezone(dt.timedelta(hours=offset))
 
 
-@router.get("/events")
-async def sse_events(request: Request):
-    """Server-Sent Events endpoint for real-time updates."""
-    async def event_generator():
-        queue = event_hub.subscribe()
-        log.debug("SSE client connected")
-        try:
-            while True:
-                # Check if client disconnected
-                if await request.is_disconnected():
-                    log.debug("SSE client disconnected")
-                    break
-                try:
-                    # Wait for message with timeout
-                    message = await asyncio.wait_for(queue.get(), timeout=15.0)
-                    log.debug("SSE sending message: %s", message[:100])
-                    yield f"data: {message}\n\n"
-                except asyncio.TimeoutError:
-                    # Send heartbeat to keep connection alive
-                    yield ": heartbeat\n\n"
-        finally:
-            event_hub.unsubscribe(queue)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-            "Access-Control-Allow-Origin": "*",
-        }
-    )
-
-
 @router.post("/guilds/add")
 async def add_guild(
     request: Request,
@@ -183,15 +191,23 @@ async def adjust_user_points(
     user=Depends(require_session_user),
 ):
     _ensure_guild_access(request, guild_id)
-    log_service.log_violation(
-        guild_id=guild_id,
-        user_id=user_id,
-        reason=reason,
-        details=None,
-        action="adjust",
-        points=delta,
-        violation_count=0,
-    )
+    entry = {
+        "guild_id": guild_id,
+        "user_id": user_id,
+        "reason": reason,
+        "details": None,
+        "action": "adjust",
+        "points": delta,
+        "violation_count": 0,
+    }
+    # 리다이렉트된 사용자 탭에 바로 반영되도록 이 한 행만 스레드풀에서 즉시 기록한다.
+    # 봇이 쌓아 둔 대기 행은 봇의 기록 태스크에 맡긴다.
+    try:
+        await run_in_threadpool(log_service.write_violation, **entry)
+    except Exception:
+        # DB 오류로 500을 내는 대신 대기열에 넣어 봇의 다음 flush에서 다시 기록되게 한다.
+        log.exception("Failed to write point adjustment for guild %s user %s; queued instead", guild_id, user_id)
+        log_service.log_violation(**entry)
     return RedirectResponse(f"/guilds/{guild_id}?tab=users", status_code=303)
 
 
@@ -210,23 +226,21 @@ async def manage_guilds(
     bot_token = oauth_client.bot_token or ""
     names: Dict[int, str] = {}
 
-    # 병렬로 이름 조회
-    async def fetch_name(gid: int, current_name: str | None) -> tuple[int, str | None]:
-        if current_name:
-            return gid, current_name
-        if bot_token:
-            info = await oauth_client.fetch_guild(gid, bot_token)
-            if info and "name" in info:
-                return gid, info["name"]
-        return gid, None
-
-    tasks = []
-    for cfg in configs:
-        tasks.append(fetch_name(cfg.guild_id, session_guilds.get(cfg.guild_id)))
-
-    results = await asyncio.gather(*tasks)
-    for gid, name in results:
-        names[gid] = name or f"Guild {gid}"
+    async def fill_name(gid: int) -> None:
+        info = await oauth_client.fetch_guild(gid, bot_token)
+        names[gid] = info["name"] if info and "name" in info else f"Guild {gid}"
+
+    # 세션에 이름이 없는 길드만 병렬로 조회하고, 결과는 태스크가 names에 바로 채운다.
+    async with asyncio.TaskGroup() as tg:
+        for cfg in configs:
+            gid = cfg.guild_id
+            current_name = session_guilds.get(gid)
+            if current_name:
+                names[gid] = current_name
+            elif bot_token:
+                tg.create_task(fill_name(gid))
+            else:
+                names[gid] = f"Guild {gid}"
 
     # 세션 길드 이름도 최신화
     updated_session = []
@@ -263,15 +277,10 @@ async def index(
 
     # 개인용: target_guild_id가 설정된 경우 해당 길드를 기본 선택
     # 세션에 저장된 선택 길드 우선, 그다음 query param, 마지막으로 config
-    selected_id: Optional[int] = None
+    selected_id: Optional[int] = guild_id or request.session.get("selected_guild_id") or app_config.target_guild_id
     if guild_id:
-        selected_id = int(guild_id)
         # 사용자가 드롭다운에서 선택한 경우 세션에 저장
-        request.session["selected_guild_id"] = selected_id
-    elif request.session.get("selected_guild_id"):
-        selected_id = request.session.get("selected_guild_id")
-    elif app_config.target_guild_id:
-        selected_id = app_config.target_guild_id
+        request.session["selected_guild_id"] = guild_id
 
     if not user:
         return templates.TemplateResponse(
@@ -285,8 +294,9 @@ async def index(
 
     # 세션에 있는 길드에서 선택된 길드 찾기
     all_guilds_map: Dict[int, Dict[str, Any]] = {}
-    for cfg in config_store.list_all():
-        all_guilds_map[cfg.guild_id] = {"id": cfg.guild_id, "name": None}
+    # 드롭다운에는 ID만 필요하므로 설정 전체를 읽지 않는다.
+    for config_guild_id in config_store.list_guild_ids():
+        all_guilds_map[config_guild_id] = {"id": config_guild_id, "name": None}
     for g in guilds:
         if "id" in g:
             gid = int(g["id"])
@@ -297,33 +307,36 @@ async def index(
     if selected_id:
         request.session["selected_guild_id"] = selected_id
 
-    enriched = []
-    recent_logs = []
-    kicked_logs = []
+    enriched: list[GuildSummary] = []
+    recent_logs: list[LogRow] = []
+    kicked_logs: list[LogRow] = []
     active_guild_name = None
-    all_guilds_list = list(all_guilds_map.values())
-
-    # 병렬 이름 조회 준비
-    missing_name_guilds = [g for g in all_guilds_list if not g.get("name")]
-    if missing_name_guilds and oauth_client.bot_token:
-        async def fetch_guild_name(g_dict: Dict[str, Any]):
-            gid = int(g_dict["id"])
-            info = await oauth_client.fetch_guild(gid, oauth_client.bot_token)
-            if info and "name" in info:
-                g_dict["name"] = info["name"]
-
-        await asyncio.gather(*(fetch_guild_name(g) for g in missing_name_guilds))
-
-    for gid, ginfo in all_guilds_map.items():
-        if selected_id and gid != selected_id:
-            continue
+    all_guilds_list: list[Dict[str, Any]] = []
+    bot_token = oauth_client.bot_token
+
+    async def fetch_guild_name(g_dict: Dict[str, Any]):
+        info = await oauth_client.fetch_guild(g_dict["id"], bot_token)
+        if info and "name" in info:
+            g_dict["name"] = info["name"]
+
+    # 드롭다운 목록 구성과 이름 없는 길드의 병렬 조회 예약을 한 번의 순회로 처리한다.
+    async with asyncio.TaskGroup() as tg:
+        for ginfo in all_guilds_map.values():
+            all_guilds_list.append(ginfo)
+            if bot_token and not ginfo["name"]:
+                tg.create_task(fetch_guild_name(ginfo))
+
+    # 길드가 하나라도 있으면 위에서 selected_id가 정해지므로, 로그는 선택된 길드만 채운다.
+    targets = [(selected_id, all_guilds_map[selected_id])] if selected_id in all_guilds_map else []
+    for gid, ginfo in targets:
         settings = config_store.get_or_create(gid)
-        entries = log_service.fetch_logs(gid, limit=15)
-        enriched.append({"info": ginfo, "settings": settings})
+        entries = await run_in_threadpool(log_service.fetch_logs, gid, limit=15)
+        enriched.append(GuildSummary(ginfo, settings))
         for entry in entries:
-            recent_logs.append({"guild": ginfo, "log": entry})
+            row = LogRow(ginfo, entry)
+            recent_logs.append(row)
             if (entry.action or "").lower() in {"kick", "ban"}:
-                kicked_logs.append({"guild": ginfo, "log": entry})
+                kicked_logs.append(row)
         if ginfo.get("name"):
             active_guild_name = ginfo["name"]
 
@@ -333,8 +346,9 @@ async def index(
             "request": request,
             "user": user,
             "guilds": enriched,
-            "recent_logs": sorted(recent_logs, key=lambda x: x["log"].timestamp, reverse=True)[:30],
-            "kicked_logs": sorted(kicked_logs, key=lambda x: x["log"].timestamp, reverse=True)[:30],
+            # 전체 정렬 없이 최신 30건만 고른다.
+            "recent_logs": nlargest(INDEX_LOG_LIMIT, recent_logs, key=_log_row_timestamp),
+            "kicked_logs": nlargest(INDEX_LOG_LIMIT, kicked_logs, key=_log_row_timestamp),
             "active_guild_id": selected_id,
             "active_guild_name": active_guild_name,
             "all_guilds": all_guilds_list,
@@ -373,43 +387,24 @@ async def guild_detail(
     members = {}
 
     if tab == "logs":
-        logs = log_service.fetch_logs(guild_id, limit=50)
+        logs = await run_in_threadpool(log_service.fetch_logs, guild_id, limit=50)
     elif tab == "debug":
-        debug_logs = log_service.fetch_action_logs(guild_id, action="test", limit=50)
+        debug_logs = await run_in_threadpool(log_service.fetch_action_logs, guild_id, action="test", limit=50)
         if bot_token and debug_logs:
             # 디버그 로그의 사용자 닉네임 조회
             debug_user_ids = list(set(log.user_id for log in debug_logs))[:50]
-            
-            async def fetch_debug_member(uid: int):
-                info = await oauth_client.fetch_guild_member(guild_id, uid, bot_token)
-                return uid, info
-
-            results = await asyncio.gather(*(fetch_debug_member(uid) for uid in debug_user_ids))
-            for uid, info in results:
-                if info:
-                    members[uid] = info
+            members = await oauth_client.fetch_guild_members_bulk(guild_id, debug_user_ids, bot_token)
     elif tab == "users":
-        user_points = log_service.fetch_user_points(guild_id, limit=500)
+        user_points = await run_in_threadpool(log_service.fetch_user_points, guild_id, limit=500)
         if bot_token:
-            # 병렬 멤버 정보 조회
+            # 상위 사용자 멤버 정보 일괄 조회
             member_ids = [row["user_id"] for row in user_points[:50]]
-            
-            async def fetch_member(uid: int):
-                info = await oauth_client.fetch_guild_member(guild_id, uid, bot_token)
-                return uid, info
-
-            results = await asyncio.gather(*(fetch_member(uid) for uid in member_ids))
-            for uid, info in results:
-                if info:
-                    members[uid] = info
+            members = await oauth_client.fetch_guild_members_bulk(guild_id, member_ids, bot_token)
 
     currency_next_run_iso = None
     currency_next_run_display = None
     if app_config.currency_report.enabled:
-        next_run_dt = compute_next_run(app_config.currency_report)
-        currency_next_run_iso = next_run_dt.astimezone(dt.timezone.utc).isoformat()
-        local_tz = _resolve_timezone(app_config.currency_report.timezone)
-        currency_next_run_display = next_run_dt.astimezone(local_tz).strftime("%Y-%m-%d %H:%M %Z")
+        currency_next_run_iso, currency_next_run_display = _currency_next_run(app_config.currency_report)
 
     currency_channels: list[Dict[str, Any]] = []
     if tab == "currency" and bot_token:
@@ -533,6 +528,8 @@ async def test_currency_report(
     channel_id: str = Form(""),
     config_store: GuildConfigStore = Depends(get_config_store),
     app_config: AppConfig = Depends(get_app_config),
+    currency_reporter: CurrencyReporter = Depends(get_currency_reporter),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
     user=Depends(require_session_user),
 ):
     _ensure_guild_access(request, guild_id)
@@ -546,15 +543,19 @@ async def test_currency_report(
     target_channel = override_channel or settings.currency_report_channel_id or app_config.currency_report.channel_id
     if not target_channel:
         raise HTTPException(status_code=400, detail="전송할 채널이 설정되어 있지 않습니다.")
-    reporter = CurrencyReporter(app_config.currency_report)
-    report = await reporter.build_report()
+    report = await currency_reporter.build_report()
     if not report:
         raise HTTPException(status_code=502, detail="환율 정보를 가져오지 못했습니다.")
-    await _send_discord_message(target_channel, app_config.discord.token, report)
+    await _send_discord_message(http_client, target_channel, app_config.discord.token, report)
     return RedirectResponse(f"/guilds/{guild_id}?tab=currency", status_code=303)
 
 
-async def _send_discord_message(channel_id: int, token: str, report: CurrencyReportResult) -> None:
+async def _send_discord_message(
+    client: httpx.AsyncClient,
+    channel_id: int,
+    token: str,
+    report: CurrencyReportResult,
+) -> None:
     if not token:
         raise HTTPException(status_code=500, detail="봇 토큰이 설정되어 있지 않습니다.")
     url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
@@ -566,8 +567,7 @@ async def _send_discord_message(channel_id: int, token: str, report: CurrencyRep
         "content": "",
         "embeds": [report.to_embed_dict()],
     }
-    async with httpx.AsyncClient(timeout=15) as client:
-        response = await client.post(url, json=payload, headers=headers)
+    response = await client.post(url, content=dumps(payload), headers=headers)
     if response.status_code >= 400:
         log.error("Failed to send Discord message: %s %s", response.status_code, response.text)
         raise HTTPException(status_code=response.status_code, detail="디스코드 메시지 전송에 실패했습니다.")
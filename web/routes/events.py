@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import FrozenSet, Optional
+from urllib.parse import parse_qs
+
+from starlette.types import Receive, Scope, Send
+
+from web.utils.event_hub import deflate_segment, get_hub
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+_HEARTBEAT_FRAME = b": heartbeat\n\n"
+_HEARTBEAT_SEGMENT = deflate_segment(_HEARTBEAT_FRAME)
+# mtime 0, OS unknown인 고정 gzip 헤더. 뒤에는 허브가 만든 raw deflate 조각을 그대로 이어 붙인다.
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+_RESPONSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache, no-store, must-revalidate"),
+    (b"connection", b"keep-alive"),
+    (b"x-accel-buffering", b"no"),
+    (b"access-control-allow-origin", b"*"),
+    (b"vary", b"accept-encoding"),
+]
+_RESPONSE_START = {"type": "http.response.start", "status": 200, "headers": _RESPONSE_HEADERS}
+_RESPONSE_START_GZIP = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": _RESPONSE_HEADERS + [(b"content-encoding", b"gzip")],
+}
+
+
+class EventStreamEndpoint:
+    """
+    Server-Sent Events endpoint for real-time updates, written as a raw ASGI app.
+    Register with `app.add_route("/events", ...)`; Starlette passes non-function endpoints through as ASGI.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gzip = _accepts_gzip(scope)
+        heartbeat = _HEARTBEAT_SEGMENT if gzip else _HEARTBEAT_FRAME
+        hub = get_hub()
+        queue = hub.subscribe(gzip=gzip, topics=_requested_topics(scope))
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        getter: asyncio.Future | None = None
+        log.debug("SSE client connected")
+        try:
+            if gzip:
+                await send(_RESPONSE_START_GZIP)
+                await send({"type": "http.response.body", "body": _GZIP_HEADER, "more_body": True})
+            else:
+                await send(_RESPONSE_START)
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get_all())
+                done, _ = await asyncio.wait(
+                    (getter, disconnected),
+                    timeout=HEARTBEAT_INTERVAL_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    log.debug("SSE client disconnected")
+                    break
+                if getter not in done:
+                    # 대기 중인 get_all()은 그대로 두고 연결 유지용 하트비트만 보낸다.
+                    await send({"type": "http.response.body", "body": heartbeat, "more_body": True})
+                    continue
+                chunks = getter.result()
+                getter = None
+                if chunks is None:
+                    # 너무 오래 읽지 않아 허브에서 끊긴 구독자. 응답을 끝내면 EventSource가 다시 연결한다.
+                    # gzip이면 트레일러 없이 끝나지만 어차피 읽지 않던 연결이라 다시 연결만 유도하면 된다.
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    break
+                dropped = queue.take_dropped()
+                if dropped:
+                    notice = b'event: dropped\ndata: {"type":"dropped","n":%d}\n\n' % dropped
+                    chunks.insert(0, deflate_segment(notice) if gzip else notice)
+                # 쌓여 있던 청크를 한 번의 send로 내보낸다.
+                body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        finally:
+            if getter is not None:
+                getter.cancel()
+            disconnected.cancel()
+            hub.unsubscribe(queue)
+
+
+def _requested_topics(scope: Scope) -> Optional[FrozenSet[str]]:
+    # ?topics=new_log,other 처럼 받을 이벤트 종류를 고를 수 있다. 없으면 전부 받는다.
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("topics")
+    if not values:
+        return None
+    topics = frozenset(topic for value in values for topic in value.split(",") if topic)
+    return topics or None
+
+
+def _accepts_gzip(scope: Scope) -> bool:
+    # "gzip;q=0"은 거부라는 뜻이므로 코딩 목록을 나눠 q 값까지 본다. gzip이 없으면 "*"를 따른다.
+    wildcard = False
+    for name, value in scope["headers"]:
+        if name != b"accept-encoding":
+            continue
+        for coding in value.split(b","):
+            token, _, params = coding.partition(b";")
+            token = token.strip().lower()
+            if token == b"gzip":
+                return _quality(params) > 0
+            if token == b"*":
+                wildcard = _quality(params) > 0
+    return wildcard
+
+
+def _quality(params: bytes) -> float:
+    for param in params.split(b";"):
+        key, _, value = param.partition(b"=")
+        if key.strip().lower() == b"q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+sse_endpoint = EventStreamEndpoint()
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import secrets
-from dataclasses import dataclass
-from typing import Any, Dict, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List
+from urllib.parse import quote
 
 import httpx
 
 from config import OAuthConfig
+from web.utils.ttl_lru import TtlLru
 
 DISCORD_API_BASE = "https://discord.com/api"
+# 대시보드가 여러 길드/멤버를 병렬 조회하므로 keep-alive 연결을 넉넉히 유지한다.
+DISCORD_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# 길드 이름/멤버 정보는 자주 바뀌지 않으므로 페이지를 열 때마다 디스코드에 묻지 않는다.
+GUILD_CACHE_TTL_SECONDS = 600
+GUILD_MISSING_CACHE_TTL_SECONDS = 60
+MEMBER_CACHE_TTL_SECONDS = 120
+# 멤버 목록 API 한 페이지 크기. 길드 전체가 한 페이지에 들어올 때만 목록으로 일괄 조회한다.
+MEMBER_LIST_PAGE_SIZE = 1000
+
+_NOT_CACHED: Any = object()
 
 
 @dataclass(slots=True)
@@ -17,23 +30,56 @@ class OAuthToken:
     refresh_token: str | None
     token_type: str
     expires_in: int
+    # 사용자 정보/길드 목록 요청이 같은 헤더를 쓰므로 한 번만 만든다.
+    auth_headers: Dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.auth_headers = {"Authorization": f"{self.token_type} {self.access_token}"}
 
 
 class DiscordOAuthClient:
     def __init__(self, config: OAuthConfig):
         self.config = config
         # 봇 토큰이 있다면 멤버 조회 등에 활용한다.
-        self.bot_token = None
+        self._bot_token: str | None = None
+        self._bot_headers: Dict[str, str] = {}
+        # 호출마다 클라이언트를 만들면 TCP/TLS 연결을 매번 새로 맺으므로 하나를 공유한다.
+        self._client = httpx.AsyncClient(base_url=DISCORD_API_BASE, timeout=15, limits=DISCORD_HTTP_LIMITS)
+        self._guild_cache: TtlLru[Dict[str, Any] | None] = TtlLru(maxsize=1024, ttl=GUILD_CACHE_TTL_SECONDS)
+        self._member_cache: TtlLru[Dict[str, Any] | None] = TtlLru(maxsize=8192, ttl=MEMBER_CACHE_TTL_SECONDS)
+        # 로그인 URL은 state만 바뀌므로 나머지는 한 번만 만든다.
+        self._auth_url_prefix = self._build_auth_url_prefix()
+
+    @property
+    def bot_token(self) -> str | None:
+        return self._bot_token
+
+    @bot_token.setter
+    def bot_token(self, value: str | None) -> None:
+        # 요청마다 인증 헤더를 새로 만들지 않도록 토큰을 바꿀 때 미리 만들어 둔다.
+        self._bot_token = value
+        self._bot_headers = {"Authorization": f"Bot {value}"} if value else {}
+
+    def _headers_for_bot(self, bot_token: str) -> Dict[str, str]:
+        if bot_token == self._bot_token:
+            return self._bot_headers
+        return {"Authorization": f"Bot {bot_token}"}
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
     def authorization_url(self, state: str) -> str:
+        return self._auth_url_prefix + state
+
+    def _build_auth_url_prefix(self) -> str:
         scope_values = list(self.config.scopes)
         if "guilds" not in scope_values:
             scope_values.append("guilds")
         scopes = "+".join(scope_values)
         return (
             f"{DISCORD_API_BASE}/oauth2/authorize?client_id={self.config.client_id}"
-            f"&redirect_uri={self.config.redirect_uri}"
-            f"&response_type=code&scope={scopes}&prompt=consent&state={state}"
+            f"&redirect_uri={quote(self.config.redirect_uri, safe='')}"
+            f"&response_type=code&scope={scopes}&prompt=consent&state="
         )
 
     async def exchange_code(self, code: str) -> OAuthToken:
@@ -44,55 +90,115 @@ class DiscordOAuthClient:
             "code": code,
             "redirect_uri": self.config.redirect_uri,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{DISCORD_API_BASE}/oauth2/token", data=data)
-            response.raise_for_status()
-            payload = response.json()
-            return OAuthToken(
-                access_token=payload["access_token"],
-                refresh_token=payload.get("refresh_token"),
-                token_type=payload.get("token_type", "Bearer"),
-                expires_in=payload.get("expires_in", 0),
-            )
+        response = await self._client.post("/oauth2/token", data=data)
+        response.raise_for_status()
+        payload = response.json()
+        return OAuthToken(
+            access_token=payload["access_token"],
+            refresh_token=payload.get("refresh_token"),
+            token_type=payload.get("token_type", "Bearer"),
+            expires_in=payload.get("expires_in", 0),
+        )
 
     async def fetch_user(self, token: OAuthToken) -> Dict[str, Any]:
-        headers = {"Authorization": f"{token.token_type} {token.access_token}"}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DISCORD_API_BASE}/users/@me", headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.get("/users/@me", headers=token.auth_headers)
+        response.raise_for_status()
+        return response.json()
 
     async def fetch_guilds(self, token: OAuthToken) -> List[Dict[str, Any]]:
-        headers = {"Authorization": f"{token.token_type} {token.access_token}"}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DISCORD_API_BASE}/users/@me/guilds", headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.get("/users/@me/guilds", headers=token.auth_headers)
+        response.raise_for_status()
+        return response.json()
 
     async def fetch_guild_member(self, guild_id: int, user_id: int, bot_token: str) -> Dict[str, Any] | None:
-        headers = {"Authorization": f"Bot {bot_token}"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{DISCORD_API_BASE}/guilds/{guild_id}/members/{user_id}", headers=headers)
+        async def load() -> Dict[str, Any] | None:
+            headers = self._headers_for_bot(bot_token)
+            resp = await self._client.get(f"/guilds/{guild_id}/members/{user_id}", headers=headers)
             if resp.status_code == 404:
                 return None
             resp.raise_for_status()
             return resp.json()
 
+        return await self._member_cache.get_or_set((guild_id, user_id), load)
+
+    async def fetch_guild_members_bulk(
+        self,
+        guild_id: int,
+        user_ids: Iterable[int],
+        bot_token: str,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up several members with as few requests as possible.
+        Cached members are served directly. For guilds that fit in one member-list page the rest come
+        from a single list request (needs the GUILD_MEMBERS intent); otherwise they are fetched one by one.
+        """
+        members: Dict[int, Dict[str, Any]] = {}
+        wanted: set[int] = set()
+        for user_id in user_ids:
+            cached = self._member_cache.get((guild_id, user_id), _NOT_CACHED)
+            if cached is _NOT_CACHED:
+                wanted.add(user_id)
+            elif cached is not None:
+                members[user_id] = cached
+        if not wanted:
+            return members
+
+        listed_all = False
+        guild = await self.fetch_guild(guild_id, bot_token)
+        member_count = guild.get("approximate_member_count") if guild else None
+        # 큰 길드에서 몇십 명을 찾으려고 목록을 여러 페이지 넘기면 개별 조회보다 느리고 더 엄격한 레이트 리밋을 쓴다.
+        if member_count is not None and member_count <= MEMBER_LIST_PAGE_SIZE:
+            resp = await self._client.get(
+                f"/guilds/{guild_id}/members",
+                params={"limit": MEMBER_LIST_PAGE_SIZE},
+                headers=self._headers_for_bot(bot_token),
+            )
+            # 멤버 인텐트가 없으면(401/403) 목록을 볼 수 없으므로 개별 조회로 넘어간다.
+            if resp.status_code not in (401, 403):
+                resp.raise_for_status()
+                page = resp.json()
+                for member in page:
+                    user_id = int(member["user"]["id"])
+                    if user_id in wanted:
+                        wanted.discard(user_id)
+                        members[user_id] = member
+                        self._member_cache.set((guild_id, user_id), member)
+                listed_all = len(page) < MEMBER_LIST_PAGE_SIZE
+
+        # 목록을 끝까지 봤는데도 없다면 이미 나간 사용자이므로 개별 조회하지 않는다.
+        if wanted and not listed_all:
+            async def fill_member(user_id: int) -> None:
+                member = await self.fetch_guild_member(guild_id, user_id, bot_token)
+                if member:
+                    members[user_id] = member
+
+            async with asyncio.TaskGroup() as tg:
+                for user_id in wanted:
+                    tg.create_task(fill_member(user_id))
+        return members
+
     async def fetch_guild(self, guild_id: int, bot_token: str) -> Dict[str, Any] | None:
-        headers = {"Authorization": f"Bot {bot_token}"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{DISCORD_API_BASE}/guilds/{guild_id}", headers=headers)
+        async def load() -> Dict[str, Any] | None:
+            headers = self._headers_for_bot(bot_token)
+            # approximate_member_count는 fetch_guild_members_bulk가 목록 조회 여부를 정할 때 쓴다.
+            resp = await self._client.get(f"/guilds/{guild_id}", params={"with_counts": "true"}, headers=headers)
             if resp.status_code == 404:
                 return None
             resp.raise_for_status()
             return resp.json()
 
+        # 없는 길드(404)는 짧게만 기억해 봇이 초대되면 곧 반영되게 한다.
+        return await self._guild_cache.get_or_set(
+            guild_id,
+            load,
+            ttl_for=lambda guild: GUILD_MISSING_CACHE_TTL_SECONDS if guild is None else None,
+        )
+
     async def fetch_guild_channels(self, guild_id: int, bot_token: str) -> List[Dict[str, Any]]:
-        headers = {"Authorization": f"Bot {bot_token}"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{DISCORD_API_BASE}/guilds/{guild_id}/channels", headers=headers)
-            resp.raise_for_status()
-            return resp.json()
+        headers = self._headers_for_bot(bot_token)
+        resp = await self._client.get(f"/guilds/{guild_id}/channels", headers=headers)
+        resp.raise_for_status()
+        return resp.json()
 
 
 def generate_state() -> str:
@@ -1,45 +1,308 @@
 """
 Event hub for real-time updates between bot and web.
-Uses asyncio Queue to broadcast events to multiple SSE clients.
+Broadcasts encoded SSE frames to one bounded ring buffer per SSE client.
 """
 from __future__ import annotations
 
 import asyncio
 import logging
+import weakref
+import zlib
+from collections import Counter, deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, Set
-import json
+from typing import Any, Counter as CounterType, Deque, Dict, FrozenSet, List, Optional
+
+from web.utils.json_codec import dumps
 
 log = logging.getLogger(__name__)
 
+# 구독자별 링 버퍼 크기. 느린 클라이언트는 가장 오래된 이벤트부터 버린다.
+SUBSCRIBER_QUEUE_MAXSIZE = 256
+# gzip을 받는 클라이언트용 압축 수준. 청크마다 한 번만 압축해 모든 gzip 구독자가 공유한다.
+SSE_GZIP_LEVEL = 1
+# 이만큼 연속으로 가득 찬 링에 밀어 넣는 동안 한 번도 읽지 않은 구독자는 끊는다.
+STALE_SUBSCRIBER_OVERFLOWS = 50
+# 한 번에 이만큼의 구독자에게 넣고 이벤트 루프에 양보한다.
+FANOUT_SLICE_SIZE = 512
+# 디스패처가 첫 이벤트를 받은 뒤 이 시간 동안 더 모아 구독자마다 한 번에 넣는다.
+COALESCE_WINDOW_SECONDS = 0.005
+# 디스패처가 밀렸을 때 쌓아 둘 최대 이벤트 수. 넘치면 새 이벤트를 버린다.
+INBOX_MAXSIZE = 10_000
+
+
+def deflate_segment(data: bytes) -> bytes:
+    """
+    Compress `data` as a self-contained, sync-flushed raw deflate segment.
+    Segments never refer to earlier output, so the same bytes can be appended to any client's gzip stream.
+    """
+    compressor = zlib.compressobj(SSE_GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class SpscRing:
+    """
+    Bounded single-producer/single-consumer ring of SSE chunks: a deque(maxlen) plus one asyncio.Event.
+    When full, push() overwrites the oldest chunk.
+    After close(), get_all() returns None once the ring is drained.
+    """
+
+    __slots__ = ("_items", "_ready", "_waiting", "dropped", "overflow_streak", "closed", "gzip", "topics")
+
+    def __init__(self, capacity: int, gzip: bool = False, topics: Optional[FrozenSet[str]] = None):
+        # True면 raw deflate 조각(deflate_segment)을 받는다.
+        self.gzip = gzip
+        # 받을 이벤트 종류. None이면 전부 받는다.
+        self.topics = topics
+        self._items: Deque[bytes] = deque(maxlen=max(capacity, 1))
+        self._ready = asyncio.Event()
+        # 소비자가 get_all()에서 기다리는 중일 때만 Event를 깨우면 된다.
+        self._waiting = False
+        # 아직 클라이언트에 알리지 않은, 덮어써서 잃어버린 청크 수
+        self.dropped = 0
+        # 마지막으로 읽힌 뒤 가득 찬 상태에서 밀어 넣은 횟수
+        self.overflow_streak = 0
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, item: bytes) -> bool:
+        """Append `item` and return True once the consumer has overflowed STALE_SUBSCRIBER_OVERFLOWS times unread."""
+        items = self._items
+        stale = False
+        if len(items) == items.maxlen:
+            # 느린 구독자 때문에 생산자가 기다리지 않도록 maxlen deque가 가장 오래된 항목을 밀어낸다.
+            self.dropped += 1
+            self.overflow_streak += 1
+            stale = self.overflow_streak > STALE_SUBSCRIBER_OVERFLOWS
+        items.append(item)
+        if self._waiting:
+            self._ready.set()
+        return stale
+
+    def close(self) -> None:
+        """Wake the consumer so it can finish once the remaining chunks are read."""
+        self.closed = True
+        self._ready.set()
+
+    async def get_all(self) -> Optional[List[bytes]]:
+        """
+        Wait until something is queued, then take every pending chunk at once (oldest first).
+        Returns None once the ring is closed and drained. Cancelling the wait never loses a chunk.
+        """
+        items = self._items
+        while not items:
+            if self.closed:
+                return None
+            self._ready.clear()
+            self._waiting = True
+            try:
+                await self._ready.wait()
+            finally:
+                self._waiting = False
+        chunks = list(items)
+        items.clear()
+        self.overflow_streak = 0
+        return chunks
+
+    def take_dropped(self) -> int:
+        """Return and reset how many chunks were overwritten since the last call."""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
 
 @dataclass
 class EventHub:
     """Simple pub/sub hub for broadcasting events to SSE clients."""
-    _subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    # 팬아웃 때 순서대로 훑도록 set 대신 list로 둔다.
+    _subscribers: List[SpscRing] = field(default_factory=list)
+    # 발행자는 여기에 넣기만 하고, 직렬화와 팬아웃은 디스패처 태스크가 맡는다.
+    _inbox: Optional[asyncio.Queue] = None
+    _dispatcher: Optional[asyncio.Task] = None
+    # 배치 청크를 조립할 때 재사용하는 버퍼. 구독자에게는 불변 bytes 복사본만 넘긴다.
+    _scratch: bytearray = field(default_factory=bytearray)
+    _gzip_subscribers: int = 0
+    # 종류를 골라 구독한 구독자 수와, 종류별 관심 구독자 수
+    _filtered_subscribers: int = 0
+    _topic_counts: CounterType[str] = field(default_factory=Counter)
+    # 이 허브의 링과 디스패처가 묶인 이벤트 루프
+    _loop: Optional[asyncio.AbstractEventLoop] = None
     
-    def subscribe(self) -> asyncio.Queue:
-        """Create a new subscriber queue."""
-        queue: asyncio.Queue = asyncio.Queue()
-        self._subscribers.add(queue)
+    def subscribe(
+        self,
+        maxsize: int = SUBSCRIBER_QUEUE_MAXSIZE,
+        gzip: bool = False,
+        topics: Optional[FrozenSet[str]] = None,
+    ) -> SpscRing:
+        """
+        Create a new bounded subscriber ring that receives encoded SSE frames (bytes).
+        With `gzip=True` it receives deflate_segment() output instead.
+        With `topics` it only receives events of those types.
+        """
+        queue = SpscRing(maxsize, gzip, topics)
+        self._subscribers.append(queue)
+        if gzip:
+            self._gzip_subscribers += 1
+        if topics is not None:
+            self._filtered_subscribers += 1
+            self._topic_counts.update(topics)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._loop = asyncio.get_running_loop()
+            self._inbox = asyncio.Queue(maxsize=INBOX_MAXSIZE)
+            self._dispatcher = self._loop.create_task(self._run_dispatcher())
         log.info("SSE client subscribed. Total subscribers: %d", len(self._subscribers))
         return queue
     
-    def unsubscribe(self, queue: asyncio.Queue) -> None:
-        """Remove a subscriber queue."""
-        self._subscribers.discard(queue)
+    def unsubscribe(self, queue: SpscRing) -> None:
+        """Remove a subscriber ring."""
+        subscribers = self._subscribers
+        for index, candidate in enumerate(subscribers):
+            if candidate is queue:
+                # 마지막 항목을 빈자리로 옮기고 pop해 뒤쪽 항목을 밀지 않는다.
+                subscribers[index] = subscribers[-1]
+                subscribers.pop()
+                if queue.gzip:
+                    self._gzip_subscribers -= 1
+                if queue.topics is not None:
+                    self._filtered_subscribers -= 1
+                    self._topic_counts.subtract(queue.topics)
+                break
         log.info("SSE client unsubscribed. Total subscribers: %d", len(self._subscribers))
     
-    async def publish(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Broadcast an event to all subscribers."""
-        message = json.dumps({"type": event_type, "data": data}, default=str)
-        log.info("Publishing to %d subscribers: %s", len(self._subscribers), event_type)
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Hand an event to the dispatcher task without waiting; cost does not depend on the subscriber count.
+        Events arriving within COALESCE_WINDOW_SECONDS reach each subscriber as one chunk of back-to-back SSE frames.
+        Must be called on the hub's event loop; use publish_threadsafe() from other threads.
+        `data` should already hold JSON-native values (e.g. ISO strings instead of datetimes);
+        anything else falls back to str() during encoding.
+        """
+        if self._loop is not None and self._loop.get_debug():
+            # asyncio 디버그 모드에서만 확인한다. 평소에는 같은 루프에서 부른다고 보고 검사 비용을 아낀다.
+            _check_loop(self._loop)
+        if len(self._subscribers) == self._filtered_subscribers and not self._topic_counts[event_type]:
+            # 이 종류를 보는 클라이언트가 없으면 직렬화할 필요도 없다.
+            return
+        try:
+            self._inbox.put_nowait((event_type, data))
+        except asyncio.QueueFull:
+            log.warning("SSE inbox full; dropping %s event", event_type)
+
+    def publish_threadsafe(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Schedule publish() on the hub's event loop from any thread."""
+        loop = self._loop
+        if loop is None:
+            # 아직 아무도 구독한 적이 없으면 받을 곳도 없다.
+            return
+        loop.call_soon_threadsafe(self.publish, event_type, data)
+
+    async def publish_async(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Awaitable wrapper around publish() for callers that expect a coroutine."""
+        self.publish(event_type, data)
+
+    async def close(self) -> None:
+        """Stop the dispatcher task."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+    async def _run_dispatcher(self) -> None:
+        inbox = self._inbox
+        while True:
+            first = await inbox.get()
+            # 짧게 기다려 폭주 중에 들어오는 이벤트를 한 덩어리로 묶는다.
+            await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+            events = [first]
+            while not inbox.empty():
+                events.append(inbox.get_nowait())
+            if not self._subscribers:
+                continue
+            # 이벤트마다 찍히는 로그라 DEBUG로 두고, 꺼져 있으면 인자 계산과 LogRecord 생성을 건너뛴다.
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "Publishing %d events to %d subscribers",
+                    len(events),
+                    len(self._subscribers),
+                )
+            if self._filtered_subscribers:
+                await self._dispatch_by_topics(events)
+            elif len(events) == 1:
+                await self._broadcast(self._encode(*events[0]), self._subscribers)
+            else:
+                await self._broadcast(self._encode_batch(events), self._subscribers)
+
+    async def _dispatch_by_topics(self, events: List[tuple[str, Dict[str, Any]]]) -> None:
+        # 같은 topics를 고른 구독자끼리는 같은 청크를 공유한다.
+        groups: Dict[Optional[FrozenSet[str]], List[SpscRing]] = {}
         for queue in self._subscribers:
-            try:
-                queue.put_nowait(message)
-            except asyncio.QueueFull:
-                log.warning("Queue full, skipping message")
+            groups.setdefault(queue.topics, []).append(queue)
+        frames = [(event_type, self._encode(event_type, data)) for event_type, data in events]
+        for topics, queues in groups.items():
+            wanted = [frame for event_type, frame in frames if topics is None or event_type in topics]
+            if wanted:
+                await self._broadcast(wanted[0] if len(wanted) == 1 else b"".join(wanted), queues)
+
+    def _encode(self, event_type: str, data: Dict[str, Any]) -> bytes:
+        # "event:/data:" SSE 프레임 바이트를 한 번만 만들어 모든 큐가 같은 불변 객체를 공유한다.
+        return (
+            b"event: " + event_type.encode("utf-8")
+            + b"\ndata: " + dumps({"type": event_type, "data": data}) + b"\n\n"
+        )
+
+    def _encode_batch(self, events: List[tuple[str, Dict[str, Any]]]) -> bytes:
+        # 프레임마다 중간 bytes를 만들어 join하지 않고 재사용 버퍼에 이어 쓴 뒤 한 번만 복사한다.
+        buf = self._scratch
+        buf.clear()
+        for event_type, data in events:
+            buf += b"event: "
+            buf += event_type.encode("utf-8")
+            buf += b"\ndata: "
+            buf += dumps({"type": event_type, "data": data})
+            buf += b"\n\n"
+        return bytes(buf)
+
+    async def _broadcast(self, chunk: bytes, subscribers: List[SpscRing]) -> None:
+        # gzip 구독자가 있을 때만, 그리고 청크당 한 번만 압축한다.
+        deflated = deflate_segment(chunk) if self._gzip_subscribers else chunk
+        stale: List[SpscRing] = []
+        if len(subscribers) <= FANOUT_SLICE_SIZE:
+            _push_slice(subscribers, chunk, deflated, stale)
+        else:
+            # 구독자가 많으면 조각 사이마다 루프에 양보해 한 번의 팬아웃이 다른 요청을 붙잡지 않게 한다.
+            # 슬라이스는 복사본이라 양보하는 사이 구독/해지가 일어나도 안전하다.
+            for start in range(0, len(subscribers), FANOUT_SLICE_SIZE):
+                _push_slice(subscribers[start:start + FANOUT_SLICE_SIZE], chunk, deflated, stale)
+                await asyncio.sleep(0)
+        for queue in stale:
+            # 읽지 않는 클라이언트에 메모리와 팬아웃 비용을 계속 쓰지 않도록 끊는다. 브라우저는 다시 연결한다.
+            log.warning("Dropping stale SSE subscriber after %d overflows", queue.overflow_streak)
+            self.unsubscribe(queue)
+            queue.close()
+
+
+def _check_loop(loop: asyncio.AbstractEventLoop) -> None:
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not loop:
+        raise RuntimeError("EventHub.publish() called outside its event loop; use publish_threadsafe()")
+
+
+def _push_slice(subscribers: List[SpscRing], chunk: bytes, deflated: bytes, stale: List[SpscRing]) -> None:
+    for queue in subscribers:
+        if queue.push(deflated if queue.gzip else chunk):
+            stale.append(queue)
+
+
+# 이벤트 루프마다 허브 하나. 링/디스패처가 루프에 묶여 있어 다른 루프의 구독자와 섞이면 안 된다.
+_hubs: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EventHub]" = weakref.WeakKeyDictionary()
 
 
-# Global event hub instance
-event_hub = EventHub()
+def get_hub() -> EventHub:
+    """Return the event hub of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = EventHub()
+    return hub
@@ -0,0 +1,20 @@
+"""
+JSON encoding for hot web paths. Uses orjson when it is installed and falls back to the stdlib.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    # 휠이 없는 플랫폼에서도 대시보드가 뜨도록 표준 json으로 대신한다.
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes; unknown types are stringified."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,101 @@
+"""
+Cookie-backed session middleware written directly against ASGI.
+The session is a signed JSON cookie; Set-Cookie is only sent when its contents change.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SESSION_COOKIE_NAME = b"session"
+SESSION_MAX_AGE_SECONDS = 14 * 24 * 60 * 60
+
+
+class SessionMiddleware:
+    """
+    Drop-in replacement for starlette's SessionMiddleware that exposes `scope["session"]`
+    (and therefore `request.session`) without building Request/Response objects.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret_key: str,
+        max_age: int = SESSION_MAX_AGE_SECONDS,
+        https_only: bool = False,
+    ):
+        self.app = app
+        # blake2b 키는 최대 64바이트이므로 비밀 값을 64바이트로 고정해 쓴다.
+        self._key = hashlib.sha512(secret_key.encode("utf-8")).digest()
+        self._max_age = max_age
+        attributes = f"; path=/; Max-Age={max_age}; httponly; samesite=lax"
+        if https_only:
+            attributes += "; secure"
+        self._cookie_attributes = attributes.encode("latin-1")
+        self._delete_cookie = (
+            SESSION_COOKIE_NAME + b"=null; path=/; expires=Thu, 01 Jan 1970 00:00:00 GMT; httponly; samesite=lax"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        raw_payload = self._load(scope)
+        session: Dict[str, Any] = json.loads(raw_payload) if raw_payload else {}
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                header = self._cookie_header(scope["session"], raw_payload)
+                if header is not None:
+                    message.setdefault("headers", []).append((b"set-cookie", header))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _load(self, scope: Scope) -> bytes | None:
+        for name, value in scope["headers"]:
+            if name != b"cookie":
+                continue
+            for part in value.split(b";"):
+                key, _, cookie = part.strip().partition(b"=")
+                if key == SESSION_COOKIE_NAME:
+                    return self._unsign(cookie)
+        return None
+
+    def _cookie_header(self, session: Dict[str, Any], raw_payload: bytes | None) -> bytes | None:
+        if not session:
+            # 세션이 비었으면 기존 쿠키가 있을 때만 지운다.
+            return self._delete_cookie if raw_payload else None
+        # 중첩된 dict 수정도 잡아내도록 직렬화 결과를 원본과 비교하고, 같으면 헤더를 붙이지 않는다.
+        payload = json.dumps(session, separators=(",", ":")).encode("utf-8")
+        if payload == raw_payload:
+            return None
+        return SESSION_COOKIE_NAME + b"=" + self._sign(payload) + self._cookie_attributes
+
+    def _sign(self, payload: bytes) -> bytes:
+        body = base64.urlsafe_b64encode(payload) + b"." + str(int(time.time()) + self._max_age).encode()
+        return body + b"." + self._digest(body)
+
+    def _unsign(self, cookie: bytes) -> bytes | None:
+        body, _, signature = cookie.rpartition(b".")
+        if not body or not hmac.compare_digest(self._digest(body), signature):
+            return None
+        encoded, _, expires_at = body.rpartition(b".")
+        try:
+            if int(expires_at) < time.time():
+                return None
+            return base64.urlsafe_b64decode(encoded)
+        except ValueError:
+            return None
+
+    def _digest(self, body: bytes) -> bytes:
+        digest = hashlib.blake2b(body, key=self._key, digest_size=32).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=")
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TtlLru(Generic[V]):
+    """
+    Size-bounded LRU cache whose entries expire after `ttl` seconds.
+    get_or_set() coalesces concurrent misses so only one coroutine runs the factory per key;
+    the others share its result or its exception.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        # key -> (만료 monotonic 시각, 값). 끝쪽일수록 최근에 사용한 항목이다.
+        self._od: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        # 불러오는 중인 키 -> 결과(또는 예외)를 받을 Future
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: V, ttl: float | None = None) -> None:
+        self._od[key] = (time.monotonic() + (self._ttl if ttl is None else ttl), value)
+        self._od.move_to_end(key)
+        while len(self._od) > self._maxsize:
+            self._od.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._od.pop(key, None)
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[V]],
+        ttl_for: Callable[[V], float | None] | None = None,
+    ) -> V:
+        """
+        Return the cached value or await `factory()` and cache it.
+        `ttl_for` may pick a per-value TTL (e.g. shorter for negative results); None keeps the default.
+        """
+        while True:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            try:
+                # 팩토리가 실패하면 기다리던 쪽도 같은 예외를 받아, 장애 중에 같은 요청을 N번 보내지 않는다.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 먼저 불러오던 코루틴이 취소된 경우에만 다시 시도한다.
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # 기다리는 쪽이 없어도 "exception was never retrieved" 경고가 남지 않게 한다.
+            future.exception()
+            raise
+        else:
+            self.set(key, value, ttl_for(value) if ttl_for is not None else None)
+            future.set_result(value)
+            return value
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _lookup(self, key: Hashable):
+        entry = self._od.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= time.monotonic():
+            del self._od[key]
+            return _MISSING
+        self._od.move_to_end(key)
+        return entry[1]